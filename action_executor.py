@@ -1,24 +1,255 @@
 """Action Executor - Execute various actions with sandboxing"""
 import os
+import re
 import sys
+import asyncio
+import queue
+import select
+import ssl
+import threading
+import shlex
+import struct
 import subprocess
 import logging
-import tempfile
+import time
+import atexit
+import httpx
 import requests
-from typing import Dict, Any, Optional
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Any, List, Optional, Tuple
+from cachetools import LRUCache, TTLCache
 import shutil
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from config import config
-from rag_system import rag_system
+from utils import json_dumps, json_dumps_bytes, json_loads
 
 logger = logging.getLogger(__name__)
 
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+
+DDG_API_URL = "https://api.duckduckgo.com/"
+
+# RAG query micro-batching: collect up to RAG_BATCH_MAX queries arriving within the window
+RAG_BATCH_MAX = 32
+RAG_BATCH_WINDOW = 0.005
+
+# Response body caps for scraped pages and API calls (bytes)
+SCRAPE_MAX_BYTES = 10000
+API_MAX_BYTES = 5000
+
+# Pooled read buffers for capped bodies; must cover the caps above
+RESP_BUF_SIZE = 16384
+RESP_BUF_POOL_SIZE = 16
+
+# Commands blocked in safe mode, scanned in a single case-insensitive pass (the same literal
+# substrings as the original list, so e.g. "2>/dev/null" stays allowed)
+DANGEROUS_COMMAND_RE = re.compile(r"rm -rf|dd if=|mkfs|> /dev/", re.IGNORECASE)
+
+# Anything the shell would interpret (pipes, redirects, expansion, globs, comments)
+SHELL_META_RE = re.compile(r"[|&;<>`$()\\\n*?\[\]~#{}]")
+
+# Object names for the cat-file pipe: whitespace or control characters would split or desync requests
+GIT_OBJECT_NAME_RE = re.compile(r"[^\s\x00-\x1f\x7f]+")
+
+# The persistent Python worker relies on select() over pipes, which is POSIX-only
+PY_WORKER_SUPPORTED = os.name == "posix"
+# Runs before a worker is replaced, so module state left by earlier snippets doesn't accumulate
+PY_WORKER_MAX_RUNS = 50
+
+# Long-lived interpreter loop: reads length-prefixed JSON requests, executes the code in a fresh
+# namespace and writes a length-prefixed JSON result. Frames travel on private dups of the original
+# stdin/stdout; while code runs, fds 1 and 2 point at temp files (so child-process output is captured
+# too), fd 0 is /dev/null, and the working directory, os.environ and sys.path are restored afterwards.
+# "recycle" in the result asks the host to replace the worker (threads started by the code still run).
+# With "cache" set, compiled code objects are kept in an LRU keyed by source digest
+PY_WORKER_BOOTSTRAP = r"""
+import collections, hashlib, json, os, struct, sys, tempfile, threading, traceback
+requests = os.fdopen(os.dup(0), "rb")
+replies = os.fdopen(os.dup(1), "wb")
+devnull = os.open(os.devnull, os.O_RDWR)
+for fd in (0, 1, 2):
+    os.dup2(devnull, fd)
+home = os.getcwd()
+code_cache = collections.OrderedDict()
+
+def get_code(src, use_cache):
+    if not use_cache:
+        return compile(src, "<action>", "exec")
+    key = hashlib.blake2b(src.encode(), digest_size=16).digest()
+    code = code_cache.get(key)
+    if code is None:
+        code = code_cache[key] = compile(src, "<action>", "exec")
+        if len(code_cache) > 256:
+            code_cache.popitem(last=False)
+    else:
+        code_cache.move_to_end(key)
+    return code
+
+def read_exact(n):
+    data = requests.read(n)
+    if len(data) < n:
+        sys.exit(0)
+    return data
+
+def captured(f):
+    f.seek(0)
+    return f.read().decode("utf-8", errors="replace")
+
+while True:
+    (size,) = struct.unpack(">I", read_exact(4))
+    request = json.loads(read_exact(size))
+    environ, path = dict(os.environ), list(sys.path)
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        os.dup2(out.fileno(), 1)
+        os.dup2(err.fileno(), 2)
+        success = True
+        try:
+            exec(get_code(request["code"], request.get("cache", False)), {"__name__": "__main__"})
+        except SystemExit as e:
+            success = e.code in (None, 0)
+        except BaseException:
+            success = False
+            traceback.print_exc()
+        finally:
+            sys.stdout, sys.stderr, sys.stdin = sys.__stdout__, sys.__stderr__, sys.__stdin__
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.dup2(devnull, 1)
+            os.dup2(devnull, 2)
+            os.chdir(home)
+            os.environ.clear()
+            os.environ.update(environ)
+            sys.path[:] = path
+        recycle = threading.active_count() > 1
+        payload = json.dumps({"success": success, "recycle": recycle, "stdout": captured(out), "stderr": captured(err)}).encode()
+    replies.write(struct.pack(">I", len(payload)) + payload)
+    replies.flush()
+"""
+
+
+def _create_ssl_context() -> ssl.SSLContext:
+    """Client TLS context built once per session and shared by every pooled connection (TLS 1.2+)"""
+    ctx = ssl.create_default_context()
+    ctx.minimum_version = ssl.TLSVersion.TLSv1_2
+    ctx.set_alpn_protocols(["http/1.1"])
+    return ctx
+
+
+class TLSAdapter(HTTPAdapter):
+    """HTTPAdapter whose pools all reuse one prebuilt SSLContext instead of creating one per pool"""
+    
+    def __init__(self, ssl_context: ssl.SSLContext, **kwargs):
+        self.ssl_context = ssl_context
+        super().__init__(**kwargs)
+    
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["ssl_context"] = self.ssl_context
+        return super().init_poolmanager(*args, **kwargs)
+    
+    def proxy_manager_for(self, *args, **kwargs):
+        kwargs["ssl_context"] = self.ssl_context
+        return super().proxy_manager_for(*args, **kwargs)
+
+
 class ActionExecutor:
     def __init__(self):
         self.workspace = Path(config.execution.workspace_path)
         self.workspace.mkdir(parents=True, exist_ok=True)
+        self._workspace_resolved = str(self.workspace.resolve()) + os.sep
         self.safe_mode = config.execution.safe_mode
+        # Execution settings are fixed for the process; snapshot them for the hot handlers
+        self._timeout = config.execution.timeout
+        self._max_file_size = config.execution.max_file_size
+        self._code_enabled = config.execution.code_execution_enabled
+        self._trusted_cache = config.execution.trusted_cache
+        self.http = self._create_http_session()
+        self._async_http: Optional[httpx.AsyncClient] = None
+        self._async_http_loop = None
+        self._py_workers: List[Tuple[subprocess.Popen, int]] = []  # Idle workers with their run counts
+        self._py_lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        # Normalized query -> DuckDuckGo payload, plus ETag validators for conditional refetch
+        self._resp_buf_pool: "queue.LifoQueue" = queue.LifoQueue(maxsize=RESP_BUF_POOL_SIZE)
+        self._search_cache = TTLCache(maxsize=512, ttl=600)
+        self._search_etags = LRUCache(maxsize=512)
+        self._search_lock = threading.Lock()  # cachetools caches are not thread-safe; execute_many runs handlers concurrently
+        self._git_cat: Optional[subprocess.Popen] = None
+        self._git_lock = threading.RLock()
+        self._known_dirs: set = set()
+        self._rag_queue: "queue.Queue" = queue.Queue()
+        self._rag_thread: Optional[threading.Thread] = None
+        self._rag_thread_lock = threading.Lock()
+        self._rag = None  # Loaded on first rag_query; importing rag_system loads the embedding model
+        # Reusable script files for the subprocess fallback: one per concurrent run, overwritten in place
+        self._py_scripts: List[str] = []
+        self._idle_py_scripts: List[str] = []
+        atexit.register(self._remove_py_scripts)
+        
+        self._dispatch = {
+            "bash_execute": self._bash_execute,
+            "python_execute": self._python_execute,
+            "file_read": self._file_read,
+            "file_write": self._file_write,
+            "web_search": self._web_search,
+            "web_scrape": self._web_scrape,
+            "git_operation": self._git_operation,
+            "api_call": self._api_call,
+            "rag_query": self._rag_query,
+            "install_package": self._install_package,
+            "self_modify": self._self_modify
+        }
+    
+    def _create_http_session(self) -> requests.Session:
+        """Create a pooled HTTP session so repeated calls reuse keep-alive connections"""
+        session = requests.Session()
+        adapter = TLSAdapter(
+            _create_ssl_context(),
+            pool_connections=32,
+            pool_maxsize=128,
+            pool_block=False,
+            max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update({"User-Agent": USER_AGENT})
+        return session
+    
+    def _get_async_http(self) -> httpx.AsyncClient:
+        """Get or create the HTTP/2 client bound to the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._async_http is None or self._async_http.is_closed or self._async_http_loop is not loop:
+            self._async_http = httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+                timeout=30.0,
+                headers={"User-Agent": USER_AGENT}
+            )
+            self._async_http_loop = loop
+        return self._async_http
+    
+    def close(self):
+        """Release pooled HTTP connections, the Python workers and the action pool"""
+        self.http.close()
+        self._stop_py_workers()
+        self._stop_git_cat()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+    
+    async def aclose(self):
+        """Release pooled sync and async HTTP connections"""
+        self.close()
+        if self._async_http is not None and not self._async_http.is_closed:
+            await self._async_http.aclose()
+    
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
         
     def execute(self, action: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -30,35 +261,65 @@ class ActionExecutor:
         
         logger.info(f"Executing action: {action_type}")
         
+        handler = self._dispatch.get(action_type)
+        if handler is None:
+            return {
+                "success": False,
+                "output": f"Unknown action type: {action_type}",
+                "action_type": action_type
+            }
+        
         try:
-            if action_type == "bash_execute":
-                return self._bash_execute(parameters)
-            elif action_type == "python_execute":
-                return self._python_execute(parameters)
-            elif action_type == "file_read":
-                return self._file_read(parameters)
-            elif action_type == "file_write":
-                return self._file_write(parameters)
-            elif action_type == "web_search":
-                return self._web_search(parameters)
-            elif action_type == "web_scrape":
-                return self._web_scrape(parameters)
-            elif action_type == "git_operation":
-                return self._git_operation(parameters)
-            elif action_type == "api_call":
-                return self._api_call(parameters)
-            elif action_type == "rag_query":
-                return self._rag_query(parameters)
-            elif action_type == "install_package":
-                return self._install_package(parameters)
-            elif action_type == "self_modify":
-                return self._self_modify(parameters)
-            else:
-                return {
-                    "success": False,
-                    "output": f"Unknown action type: {action_type}",
-                    "action_type": action_type
-                }
+            return handler(parameters)
+        except Exception as e:
+            logger.error(f"Error executing {action_type}: {e}")
+            return {
+                "success": False,
+                "output": str(e),
+                "action_type": action_type,
+                "error": str(e)
+            }
+    
+    def execute_many(self, actions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Execute independent actions concurrently, returning observations in the same order
+        Concurrency is capped at config.execution.max_parallel
+        """
+        if len(actions) < 2:
+            return [self.execute(action) for action in actions]
+        return list(self._get_pool().map(self.execute, actions))
+    
+    def _get_pool(self) -> ThreadPoolExecutor:
+        """Get or create the bounded action pool"""
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=config.execution.max_parallel or 8,
+                thread_name_prefix="alo-action"
+            )
+        return self._pool
+    
+    async def execute_async(self, action: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Execute an action without blocking the event loop
+        Network actions use the pooled HTTP/2 client, the rest run in a worker thread
+        """
+        action_type = action.get("action_type", "unknown")
+        parameters = action.get("parameters", {})
+        
+        async_handlers = {
+            "web_search": self._web_search_async,
+            "web_scrape": self._web_scrape_async,
+            "api_call": self._api_call_async
+        }
+        
+        handler = async_handlers.get(action_type)
+        if handler is None:
+            return await asyncio.to_thread(self.execute, action)
+        
+        logger.info(f"Executing action: {action_type}")
+        
+        try:
+            return await handler(parameters)
         except Exception as e:
             logger.error(f"Error executing {action_type}: {e}")
             return {
@@ -68,24 +329,42 @@ class ActionExecutor:
                 "error": str(e)
             }
     
+    def _shell_argv(self, command: str) -> Optional[List[str]]:
+        """
+        Split simple commands into argv so they can be spawned without /bin/sh
+        Returns None when the command needs a shell
+        """
+        if SHELL_META_RE.search(command):
+            return None
+        try:
+            argv = shlex.split(command)
+        except ValueError:
+            return None
+        # Env assignments and shell builtins (cd, export, ...) still need the shell
+        if not argv or "=" in argv[0] or shutil.which(argv[0]) is None:
+            return None
+        return argv
+    
     def _bash_execute(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Execute bash command"""
         command = params.get("command", "")
         
-        if not config.execution.code_execution_enabled:
+        if not self._code_enabled:
             return {"success": False, "output": "Code execution is disabled"}
         
-        if self.safe_mode and any(dangerous in command.lower() 
-                                 for dangerous in ["rm -rf", "dd if=", "mkfs", "> /dev/"]):
+        if self.safe_mode and DANGEROUS_COMMAND_RE.search(command):
             return {"success": False, "output": "Command blocked in safe mode"}
         
+        # Simple commands are spawned directly, skipping the extra /bin/sh exec
+        argv = self._shell_argv(command)
+        
         try:
             result = subprocess.run(
-                command,
-                shell=True,
+                argv or command,
+                shell=argv is None,
                 capture_output=True,
                 text=True,
-                timeout=config.execution.timeout,
+                timeout=self._timeout,
                 cwd=str(self.workspace)
             )
             
@@ -100,24 +379,130 @@ class ActionExecutor:
         except Exception as e:
             return {"success": False, "output": str(e), "action_type": "bash_execute"}
     
+    def _get_py_worker(self) -> Tuple[subprocess.Popen, int]:
+        """Take an idle Python worker and its run count, spawning one if none is available"""
+        with self._py_lock:
+            while self._py_workers:
+                worker, runs = self._py_workers.pop()
+                if worker.poll() is None:
+                    return worker, runs
+        return subprocess.Popen(
+            [sys.executable, "-u", "-c", PY_WORKER_BOOTSTRAP],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            bufsize=0,
+            cwd=str(self.workspace)
+        ), 0
+    
+    def _release_py_worker(self, worker: subprocess.Popen, runs: int):
+        """Return a healthy worker to the idle set"""
+        with self._py_lock:
+            self._py_workers.append((worker, runs))
+    
+    def _stop_py_worker(self, worker: subprocess.Popen):
+        """Kill a Python worker; later calls spawn a fresh one"""
+        if worker.poll() is None:
+            worker.kill()
+            worker.wait()
+    
+    def _stop_py_workers(self):
+        """Kill all idle Python workers"""
+        with self._py_lock:
+            workers, self._py_workers = self._py_workers, []
+        for worker, _ in workers:
+            self._stop_py_worker(worker)
+    
+    def _read_worker_frame(self, worker: subprocess.Popen, timeout: float) -> bytes:
+        """Read one length-prefixed frame from the worker, enforcing a deadline"""
+        fd = worker.stdout.fileno()
+        deadline = time.monotonic() + timeout
+        
+        def read_exact(n: int) -> bytes:
+            buf = bytearray()
+            while len(buf) < n:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                    raise subprocess.TimeoutExpired(worker.args, timeout)
+                chunk = os.read(fd, n - len(buf))
+                if not chunk:
+                    raise EOFError("Python worker exited unexpectedly")
+                buf += chunk
+            return bytes(buf)
+        
+        (size,) = struct.unpack(">I", read_exact(4))
+        return read_exact(size)
+    
     def _python_execute(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Execute Python code in isolated environment"""
         code = params.get("code", "")
         
-        if not config.execution.code_execution_enabled:
+        if not self._code_enabled:
             return {"success": False, "output": "Code execution is disabled"}
         
-        # Create temporary file for code
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False, dir=str(self.workspace)) as f:
-            f.write(code)
-            temp_file = f.name
+        if not PY_WORKER_SUPPORTED:
+            return self._python_execute_subprocess(code)
         
+        worker = None
+        try:
+            worker, runs = self._get_py_worker()
+            request = json_dumps_bytes({"code": code, "cache": self._trusted_cache})
+            worker.stdin.write(struct.pack(">I", len(request)) + request)
+            worker.stdin.flush()
+            
+            result = json_loads(self._read_worker_frame(worker, self._timeout))
+            # Failed runs may leave half-initialized state; leftover threads would write into later runs
+            runs += 1
+            if not result["success"] or result["recycle"] or runs >= PY_WORKER_MAX_RUNS:
+                self._stop_py_worker(worker)
+            else:
+                self._release_py_worker(worker, runs)
+            
+            return {
+                "success": result["success"],
+                "output": result["stdout"] or result["stderr"],
+                "return_code": 0 if result["success"] else 1,
+                "action_type": "python_execute"
+            }
+        except subprocess.TimeoutExpired:
+            self._stop_py_worker(worker)
+            return {"success": False, "output": "Execution timed out", "action_type": "python_execute"}
+        except Exception as e:
+            if worker is not None:
+                self._stop_py_worker(worker)
+            return {"success": False, "output": str(e), "action_type": "python_execute"}
+    
+    def _remove_py_scripts(self):
+        """Delete the reusable script files used by the subprocess fallback"""
+        for path in self._py_scripts:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+    
+    def _take_py_script(self) -> str:
+        """Take an idle script file, adding one when every file is in use"""
+        with self._py_lock:
+            if self._idle_py_scripts:
+                return self._idle_py_scripts.pop()
+            path = str(self.workspace / f".action_{os.getpid()}_{len(self._py_scripts)}.py")
+            self._py_scripts.append(path)
+            return path
+    
+    def _python_execute_subprocess(self, code: str) -> Dict[str, Any]:
+        """Execute Python code in a one-off interpreter (platforms without the worker)"""
+        # Overwrite a reusable script file instead of creating a temp file per call; the lock only
+        # covers taking and returning the file, so concurrent runs overlap
+        script = self._take_py_script()
         try:
+            with open(script, 'w', encoding='utf-8') as f:
+                f.write(code)
+            
             result = subprocess.run(
-                [sys.executable, temp_file],
+                [sys.executable, script],
                 capture_output=True,
                 text=True,
-                timeout=config.execution.timeout,
+                timeout=self._timeout,
                 cwd=str(self.workspace)
             )
             
@@ -132,11 +517,13 @@ class ActionExecutor:
         except Exception as e:
             return {"success": False, "output": str(e), "action_type": "python_execute"}
         finally:
-            # Clean up temp file
-            try:
-                os.unlink(temp_file)
-            except:
-                pass
+            with self._py_lock:
+                self._idle_py_scripts.append(script)
+    
+    def _in_workspace(self, filepath: str) -> bool:
+        """Check a path resolves inside the workspace (resolved once at init)"""
+        resolved = os.path.realpath(filepath)
+        return resolved == self._workspace_resolved[:-1] or resolved.startswith(self._workspace_resolved)
     
     def _file_read(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Read file contents"""
@@ -147,15 +534,18 @@ class ActionExecutor:
             filepath = os.path.join(self.workspace, filepath)
         
         # Safety check
-        if self.safe_mode and not str(Path(filepath).resolve()).startswith(str(self.workspace.resolve())):
+        if self.safe_mode and not self._in_workspace(filepath):
             return {"success": False, "output": "Access denied: file outside workspace"}
         
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
+            # Bounded read: never pull more than the cap (+1 byte to detect truncation)
+            max_size = self._max_file_size
+            with open(filepath, 'rb') as f:
+                raw = f.read(max_size + 1)
             
-            if len(content) > config.execution.max_file_size:
-                content = content[:config.execution.max_file_size] + "\n... (truncated)"
+            content = raw[:max_size].decode('utf-8', errors='replace')
+            if len(raw) > max_size:
+                content += "\n... (truncated)"
             
             return {
                 "success": True,
@@ -166,6 +556,16 @@ class ActionExecutor:
         except Exception as e:
             return {"success": False, "output": str(e), "action_type": "file_read"}
     
+    def _write_bytes(self, filepath: str, data: bytes):
+        """Write bytes straight to a file descriptor, bypassing the buffered text layer"""
+        fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+    
     def _file_write(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Write content to file"""
         filepath = params.get("path", "")
@@ -176,95 +576,304 @@ class ActionExecutor:
             filepath = os.path.join(self.workspace, filepath)
         
         # Safety check
-        if self.safe_mode and not str(Path(filepath).resolve()).startswith(str(self.workspace.resolve())):
+        if self.safe_mode and not self._in_workspace(filepath):
             return {"success": False, "output": "Access denied: file outside workspace"}
         
         try:
-            # Create parent directories
-            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+            # Create parent directories (once per directory for this executor)
+            parent = os.path.dirname(filepath)
+            if parent not in self._known_dirs:
+                os.makedirs(parent, exist_ok=True)
+                self._known_dirs.add(parent)
             
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(content)
+            data = content.encode('utf-8') if isinstance(content, str) else content
+            try:
+                self._write_bytes(filepath, data)
+            except FileNotFoundError:
+                # Directory was removed since it was cached; recreate and retry once
+                self._known_dirs.discard(parent)
+                os.makedirs(parent, exist_ok=True)
+                self._write_bytes(filepath, data)
+                self._known_dirs.add(parent)
             
             return {
                 "success": True,
-                "output": f"Written {len(content)} bytes to {filepath}",
+                "output": f"Written {len(data)} bytes to {filepath}",
                 "action_type": "file_write",
                 "filepath": filepath
             }
         except Exception as e:
             return {"success": False, "output": str(e), "action_type": "file_write"}
     
+    def _search_observation(self, status_code: int, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build web_search observation from a DuckDuckGo instant answer payload"""
+        if status_code != 200:
+            return {"success": False, "output": f"Search failed: {status_code}"}
+        
+        result = {
+            "abstract": data.get("Abstract", ""),
+            "url": data.get("AbstractURL", ""),
+            "related": [r.get("Text", "") for r in data.get("RelatedTopics", [])[:5]]
+        }
+        
+        return {
+            "success": True,
+            "output": json_dumps(result, indent=True),
+            "action_type": "web_search",
+            "data": result
+        }
+    
+    def _ddg_request(self, key: str) -> Tuple[Optional[Dict[str, Any]], Dict[str, str]]:
+        """Return a cached payload, or the conditional headers for refetching it"""
+        with self._search_lock:
+            cached = self._search_cache.get(key)
+            validator = self._search_etags.get(key) if cached is None else None
+        if cached is not None:
+            return cached, {}
+        return None, {"If-None-Match": validator[0]} if validator else {}
+    
+    def _ddg_response(self, key: str, status_code: int, content: bytes, etag: Optional[str]) -> Tuple[int, Dict[str, Any]]:
+        """Resolve a DuckDuckGo response (including 304) into a payload and cache it"""
+        with self._search_lock:
+            validator = self._search_etags.get(key) if status_code == 304 else None
+        
+        if validator is not None:
+            data = validator[1]
+        elif status_code == 200:
+            data = json_loads(content)
+        else:
+            return status_code, {}
+        
+        with self._search_lock:
+            if status_code == 200 and etag:
+                self._search_etags[key] = (etag, data)
+            self._search_cache[key] = data
+        return 200, data
+    
     def _web_search(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Search the web (requires DuckDuckGo or similar API)"""
         query = params.get("query", "")
+        key = query.strip().lower()
         
         try:
+            data, headers = self._ddg_request(key)
+            if data is not None:
+                return self._search_observation(200, data)
+            
             # Using DuckDuckGo instant answer API (no key required)
-            response = requests.get(
-                "https://api.duckduckgo.com/",
+            response = self.http.get(
+                DDG_API_URL,
                 params={"q": query, "format": "json"},
+                headers=headers,
                 timeout=30
             )
+            status_code, data = self._ddg_response(
+                key, response.status_code, response.content, response.headers.get("ETag")
+            )
+            return self._search_observation(status_code, data)
+        except Exception as e:
+            return {"success": False, "output": str(e), "action_type": "web_search"}
+    
+    async def _web_search_async(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Async variant of _web_search"""
+        query = params.get("query", "")
+        key = query.strip().lower()
+        
+        try:
+            data, headers = self._ddg_request(key)
+            if data is not None:
+                return self._search_observation(200, data)
             
-            if response.status_code == 200:
-                data = response.json()
-                result = {
-                    "abstract": data.get("Abstract", ""),
-                    "url": data.get("AbstractURL", ""),
-                    "related": [r.get("Text", "") for r in data.get("RelatedTopics", [])[:5]]
-                }
-                
-                return {
-                    "success": True,
-                    "output": json.dumps(result, indent=2),
-                    "action_type": "web_search",
-                    "data": result
-                }
-            else:
-                return {"success": False, "output": f"Search failed: {response.status_code}"}
+            response = await self._get_async_http().get(
+                DDG_API_URL,
+                params={"q": query, "format": "json"},
+                headers=headers
+            )
+            status_code, data = self._ddg_response(
+                key, response.status_code, response.content, response.headers.get("ETag")
+            )
+            return self._search_observation(status_code, data)
         except Exception as e:
             return {"success": False, "output": str(e), "action_type": "web_search"}
     
+    def _get_buf(self, size: int) -> bytearray:
+        """Take a pooled read buffer (or allocate one when the pool is empty or size is too large)"""
+        if size <= RESP_BUF_SIZE:
+            try:
+                return self._resp_buf_pool.get_nowait()
+            except queue.Empty:
+                pass
+        return bytearray(max(size, RESP_BUF_SIZE))
+    
+    def _put_buf(self, buf: bytearray):
+        """Return a standard-size buffer to the pool"""
+        if len(buf) == RESP_BUF_SIZE:
+            try:
+                self._resp_buf_pool.put_nowait(buf)
+            except queue.Full:
+                pass
+    
+    @staticmethod
+    def _fill_buf(buf: bytearray, n: int, chunk: bytes, limit: int) -> int:
+        """Copy chunk into buf at offset n without exceeding limit; returns the new offset"""
+        take = min(len(chunk), limit - n)
+        buf[n:n + take] = memoryview(chunk)[:take]
+        return n + take
+    
+    @staticmethod
+    def _decode_buf(buf: bytearray, n: int, encoding: Optional[str]) -> str:
+        """Decode the first n bytes of buf without an intermediate bytes copy"""
+        with memoryview(buf) as view:
+            return str(view[:n], encoding or "utf-8", "replace")
+    
+    def _read_capped(self, response: requests.Response, limit: int) -> str:
+        """Read at most limit bytes of a streamed body into a pooled buffer, leaving the rest unread"""
+        buf = self._get_buf(limit)
+        try:
+            n = 0
+            for chunk in response.iter_content(chunk_size=8192):
+                n = self._fill_buf(buf, n, chunk, limit)
+                if n >= limit:
+                    break
+            return self._decode_buf(buf, n, response.encoding)
+        finally:
+            self._put_buf(buf)
+    
+    async def _aread_capped(self, response: httpx.Response, limit: int) -> str:
+        """Async variant of _read_capped"""
+        buf = self._get_buf(limit)
+        try:
+            n = 0
+            async for chunk in response.aiter_bytes(chunk_size=8192):
+                n = self._fill_buf(buf, n, chunk, limit)
+                if n >= limit:
+                    break
+            return self._decode_buf(buf, n, response.encoding)
+        finally:
+            self._put_buf(buf)
+    
+    def _scrape_observation(self, url: str, status_code: int, text: str) -> Dict[str, Any]:
+        """Build web_scrape observation from a fetched page"""
+        if status_code != 200:
+            return {"success": False, "output": f"HTTP {status_code}"}
+        
+        # Simple text extraction (in production, use BeautifulSoup)
+        return {
+            "success": True,
+            "output": text,
+            "action_type": "web_scrape",
+            "url": url,
+            "status_code": status_code
+        }
+    
     def _web_scrape(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Scrape webpage content"""
         url = params.get("url", "")
         
         try:
-            response = requests.get(url, timeout=30, headers={
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-            })
-            
-            if response.status_code == 200:
-                # Simple text extraction (in production, use BeautifulSoup)
-                content = response.text[:10000]  # Limit to 10KB
-                
-                return {
-                    "success": True,
-                    "output": content,
-                    "action_type": "web_scrape",
-                    "url": url,
-                    "status_code": response.status_code
-                }
-            else:
-                return {"success": False, "output": f"HTTP {response.status_code}"}
+            with self.http.get(url, timeout=30, stream=True) as response:
+                text = self._read_capped(response, SCRAPE_MAX_BYTES) if response.status_code == 200 else ""
+                return self._scrape_observation(url, response.status_code, text)
         except Exception as e:
             return {"success": False, "output": str(e), "action_type": "web_scrape"}
     
+    async def _web_scrape_async(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Async variant of _web_scrape"""
+        url = params.get("url", "")
+        
+        try:
+            async with self._get_async_http().stream("GET", url) as response:
+                text = await self._aread_capped(response, SCRAPE_MAX_BYTES) if response.status_code == 200 else ""
+                return self._scrape_observation(url, response.status_code, text)
+        except Exception as e:
+            return {"success": False, "output": str(e), "action_type": "web_scrape"}
+    
+    def _stop_git_cat(self):
+        """Stop the cat-file coprocess (refs may have moved)"""
+        with self._git_lock:
+            proc = self._git_cat
+            self._git_cat = None
+        if proc is not None and proc.poll() is None:
+            proc.stdin.close()
+            proc.wait()
+    
+    def _git_cat_file(self, obj: str) -> Tuple[Optional[str], str]:
+        """
+        Look up an object through a long-lived `git cat-file --batch` coprocess
+        Returns (oid, content) or (None, error message); trees are listed as `git cat-file -p` does
+        """
+        if not GIT_OBJECT_NAME_RE.fullmatch(obj):
+            return None, f"Invalid object name: {obj!r}"
+        
+        with self._git_lock:
+            if self._git_cat is None or self._git_cat.poll() is not None:
+                self._git_cat = subprocess.Popen(
+                    ["git", "cat-file", "--batch"],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    cwd=str(self.workspace)
+                )
+        
+            proc = self._git_cat
+            proc.stdin.write(obj.encode() + b"\n")
+            proc.stdin.flush()
+        
+            header = proc.stdout.readline().decode(errors="replace").split()
+            if len(header) == 2 and header[1] in ("missing", "ambiguous"):
+                return None, f"{obj}: {header[1]}"
+            if len(header) != 3 or not header[2].isdigit():
+                # Exited or out of step with our requests; a fresh process starts on the next call
+                self._stop_git_cat()
+                return None, "git cat-file exited (is the workspace a git repository?)"
+        
+            oid, obj_type, size = header
+            content = proc.stdout.read(int(size) + 1)[:-1]  # Strip trailing LF
+            if obj_type == "tree":
+                return oid, self._format_git_tree(content, len(oid) // 2)
+            return oid, content.decode(errors="replace")
+    
+    @staticmethod
+    def _format_git_tree(data: bytes, oid_size: int) -> str:
+        """List raw tree entries ("<mode> <name>\\0<binary oid>") in `git cat-file -p` format"""
+        lines = []
+        pos = 0
+        while pos < len(data):
+            name_end = data.index(b"\0", pos)
+            mode, name = data[pos:name_end].split(b" ", 1)
+            oid = data[name_end + 1:name_end + 1 + oid_size].hex()
+            pos = name_end + 1 + oid_size
+            entry_type = {b"40000": "tree", b"160000": "commit"}.get(mode, "blob")
+            lines.append(f"{mode.decode().zfill(6)} {entry_type} {oid}\t{name.decode(errors='replace')}\n")
+        return "".join(lines)
+    
     def _git_operation(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Perform git operations"""
-        operation = params.get("operation", "")  # clone, pull, push, commit
+        operation = params.get("operation", "")  # clone, pull, push, commit, cat-file, rev-parse
         repo_url = params.get("repo_url", "")
         message = params.get("message", "")
         
         try:
+            if operation in ("cat-file", "rev-parse"):
+                # Read-only lookups share one cat-file process instead of forking git per call
+                oid, content = self._git_cat_file(params.get("object", "HEAD"))
+                return {
+                    "success": oid is not None,
+                    "output": (content if operation == "cat-file" else oid) if oid else content,
+                    "action_type": "git_operation",
+                    "operation": operation
+                }
+            
+            # Anything below may move refs under the cat-file process
+            self._stop_git_cat()
+            
             if operation == "clone":
                 result = subprocess.run(
                     ["git", "clone", repo_url],
                     capture_output=True,
                     text=True,
                     cwd=str(self.workspace),
-                    timeout=config.execution.timeout
+                    timeout=self._timeout
                 )
             elif operation == "pull":
                 result = subprocess.run(
@@ -272,7 +881,7 @@ class ActionExecutor:
                     capture_output=True,
                     text=True,
                     cwd=str(self.workspace),
-                    timeout=config.execution.timeout
+                    timeout=self._timeout
                 )
             elif operation == "commit":
                 subprocess.run(["git", "add", "."], cwd=str(self.workspace))
@@ -288,7 +897,7 @@ class ActionExecutor:
                     capture_output=True,
                     text=True,
                     cwd=str(self.workspace),
-                    timeout=config.execution.timeout
+                    timeout=self._timeout
                 )
             else:
                 return {"success": False, "output": f"Unknown git operation: {operation}"}
@@ -302,6 +911,21 @@ class ActionExecutor:
         except Exception as e:
             return {"success": False, "output": str(e), "action_type": "git_operation"}
     
+    def _api_observation(self, status_code: int, text: str, data: Any) -> Dict[str, Any]:
+        """Build api_call observation"""
+        return {
+            "success": status_code < 400,
+            "output": text[:API_MAX_BYTES],  # Limit response size
+            "action_type": "api_call",
+            "status_code": status_code,
+            "data": data
+        }
+    
+    def _api_json_observation(self, status_code: int, body: bytes, encoding: Optional[str]) -> Dict[str, Any]:
+        """Build api_call observation from a JSON body: decode only the output slice, parse the bytes once"""
+        output = body[:API_MAX_BYTES].decode(encoding or "utf-8", errors="replace")
+        return self._api_observation(status_code, output, json_loads(body) if body else None)
+    
     def _api_call(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Make HTTP API call"""
         method = params.get("method", "GET").upper()
@@ -310,31 +934,102 @@ class ActionExecutor:
         data = params.get("data")
         
         try:
-            response = requests.request(
+            with self.http.request(
                 method,
                 url,
                 headers=headers,
                 json=data if data else None,
-                timeout=30
-            )
-            
-            return {
-                "success": response.status_code < 400,
-                "output": response.text[:5000],  # Limit response size
-                "action_type": "api_call",
-                "status_code": response.status_code,
-                "data": response.json() if response.headers.get("content-type", "").startswith("application/json") else None
-            }
+                timeout=30,
+                stream=True
+            ) as response:
+                # JSON bodies are parsed whole; anything else is read up to the cap
+                if response.headers.get("content-type", "").startswith("application/json"):
+                    return self._api_json_observation(response.status_code, response.content, response.encoding)
+                return self._api_observation(
+                    response.status_code, self._read_capped(response, API_MAX_BYTES), None
+                )
         except Exception as e:
             return {"success": False, "output": str(e), "action_type": "api_call"}
     
+    async def _api_call_async(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Async variant of _api_call"""
+        method = params.get("method", "GET").upper()
+        url = params.get("url", "")
+        headers = params.get("headers", {})
+        data = params.get("data")
+        
+        try:
+            async with self._get_async_http().stream(
+                method,
+                url,
+                headers=headers,
+                json=data if data else None
+            ) as response:
+                if response.headers.get("content-type", "").startswith("application/json"):
+                    body = await response.aread()
+                    return self._api_json_observation(response.status_code, body, response.encoding)
+                return self._api_observation(
+                    response.status_code, await self._aread_capped(response, API_MAX_BYTES), None
+                )
+        except Exception as e:
+            return {"success": False, "output": str(e), "action_type": "api_call"}
+    
+    def _get_rag(self):
+        """Import the RAG system on first use"""
+        if self._rag is None:
+            from rag_system import rag_system
+            self._rag = rag_system
+        return self._rag
+    
+    def _rag_batch_loop(self):
+        """Background loop: drain queued RAG queries and answer them with one batched search"""
+        rag = self._rag
+        while True:
+            batch = [self._rag_queue.get()]
+            deadline = time.monotonic() + RAG_BATCH_WINDOW
+            while len(batch) < RAG_BATCH_MAX:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._rag_queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            by_n_results = defaultdict(list)
+            for query, n_results, future in batch:
+                by_n_results[n_results].append((query, future))
+            
+            for n_results, items in by_n_results.items():
+                try:
+                    results = rag.search_batch([q for q, _ in items], n_results=n_results)
+                    for (_, future), result in zip(items, results):
+                        future.set_result(result)
+                except Exception as e:
+                    for _, future in items:
+                        future.set_exception(e)
+    
+    def _submit_rag_query(self, query: str, n_results: int) -> List[Dict[str, Any]]:
+        """Queue a query for the batching loop and wait for its results"""
+        if self._rag_thread is None:
+            with self._rag_thread_lock:  # Concurrent first callers must not each start a loop
+                if self._rag_thread is None:
+                    self._get_rag()  # Import in the caller so load errors surface as an observation
+                    thread = threading.Thread(target=self._rag_batch_loop, name="alo-rag-batch", daemon=True)
+                    thread.start()
+                    self._rag_thread = thread
+        
+        future: Future = Future()
+        self._rag_queue.put((query, n_results, future))
+        return future.result(timeout=self._timeout)
+    
     def _rag_query(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Query RAG system"""
         query = params.get("query", "")
         n_results = params.get("n_results", 5)
         
         try:
-            results = rag_system.search(query, n_results=n_results)
+            results = self._submit_rag_query(query, n_results)
             
             formatted_output = "\n\n".join([
                 f"[Similarity: {r['similarity']:.2f}] {r['text'][:200]}..."
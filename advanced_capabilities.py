@@ -4,29 +4,138 @@ Includes web search, API integrations, and extended actions
 """
 
 import aiohttp
+import asyncio
 import json
 import logging
-from typing import Dict, List, Tuple, Optional
+import os
+import shutil
+from typing import Any, Awaitable, Callable, Dict, List, Tuple, Optional, Union
 from datetime import datetime
+from functools import partial
+import random
 import re
-from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser
 from urllib.parse import urljoin, urlparse
+from cachetools import TTLCache
+from utils import json_dumps, json_loads
+
+try:
+    import pygit2
+except ImportError:  # pygit2 is optional; git operations fall back to the git CLI
+    pygit2 = None
 
 logger = logging.getLogger(__name__)
 
+# One connection pool (keep-alive sockets, DNS cache) for search, scrape and API traffic
+_SHARED_SESSION: Optional[aiohttp.ClientSession] = None
+_SHARED_SESSION_LOOP: Optional[asyncio.AbstractEventLoop] = None
+
+
+async def get_shared_session() -> aiohttp.ClientSession:
+    """Get or create the process-wide aiohttp session"""
+    global _SHARED_SESSION, _SHARED_SESSION_LOOP
+    loop = asyncio.get_running_loop()
+    if _SHARED_SESSION is None or _SHARED_SESSION.closed or _SHARED_SESSION_LOOP is not loop:
+        connector = aiohttp.TCPConnector(
+            limit=200,
+            limit_per_host=32,
+            ttl_dns_cache=300,
+            keepalive_timeout=75,
+            enable_cleanup_closed=True
+        )
+        _SHARED_SESSION = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=30, connect=10, sock_read=20),
+            cookie_jar=aiohttp.DummyCookieJar(),  # Scraped sites must not leak cookies into API calls
+            json_serialize=json_dumps
+        )
+        _SHARED_SESSION_LOOP = loop
+    return _SHARED_SESSION
+
+
+async def close_shared_session():
+    """Close the process-wide session; the next request opens a new one"""
+    global _SHARED_SESSION, _SHARED_SESSION_LOOP
+    if _SHARED_SESSION and not _SHARED_SESSION.closed:
+        await _SHARED_SESSION.close()
+    _SHARED_SESSION = None
+    _SHARED_SESSION_LOOP = None
+
+
+# Raw bytes read from a scraped page before parsing; the rest of the body is never buffered
+SCRAPE_MAX_BYTES = 512 * 1024
+SCRAPE_CHUNK_SIZE = 64 * 1024
+
+# Fail fast on stalled peers so they release connector slots early
+SCRAPE_TIMEOUT = aiohttp.ClientTimeout(total=10, connect=3, sock_connect=3, sock_read=5)
+API_TIMEOUT = aiohttp.ClientTimeout(total=30, connect=3, sock_connect=3, sock_read=5)
+
+# Browser-like request headers: compressed HTML and the regular (not fallback) result page.
+# brotli is only decoded by aiohttp when the brotli package is installed, so it isn't offered
+BROWSER_HEADERS = {
+    'User-Agent': (
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+        '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+    ),
+    'Accept': 'text/html,application/xhtml+xml;q=0.9,*/*;q=0.8',
+    'Accept-Encoding': 'gzip, deflate',
+    'Accept-Language': 'en-US,en;q=0.9',
+}
+
+# Concurrent requests allowed per API host (kept under provider rate limits)
+DEFAULT_HOST_CONCURRENCY = {
+    'api.openai.com': 8,
+    'api.anthropic.com': 4,
+    'serpapi.com': 4,
+}
+HOST_CONCURRENCY_FALLBACK = 16
+
+DDG_RESULT_SELECTOR = 'div.result:has(a.result__a):has(a.result__snippet)'
+
+_WS_RE = re.compile(r'\s+')
+_CODE_BLOCK_RE = re.compile(r'```(\w+)?\n(.*?)```', re.DOTALL)
+
 
 class WebSearchCapability:
     """Web search and scraping capabilities"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, cache_ttl: float = 300):
         self.api_key = api_key
-        self.session = None
+        # Repeated queries/URLs within cache_ttl seconds are served from memory; 0 disables
+        self._search_cache = TTLCache(maxsize=256, ttl=cache_ttl) if cache_ttl else None
+        self._scrape_cache = TTLCache(maxsize=256, ttl=cache_ttl) if cache_ttl else None
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
     
     async def _get_session(self) -> aiohttp.ClientSession:
-        """Get or create aiohttp session"""
-        if self.session is None or self.session.closed:
-            self.session = aiohttp.ClientSession()
-        return self.session
+        """Get the shared aiohttp session"""
+        return await get_shared_session()
+    
+    async def _cached(
+        self,
+        cache: Optional[TTLCache],
+        key: Tuple,
+        fetch: Callable[[], Awaitable[Any]],
+        should_cache: Callable[[Any], bool]
+    ) -> Any:
+        """Serve key from cache, or run fetch once for all concurrent callers and cache good results"""
+        if cache is None:
+            return await fetch()
+        if key in cache:
+            return cache[key]
+        
+        task = self._inflight.get(key)
+        if task is None:
+            async def run():
+                try:
+                    result = await fetch()
+                    if should_cache(result):
+                        cache[key] = result
+                    return result
+                finally:
+                    self._inflight.pop(key, None)
+            
+            task = self._inflight[key] = asyncio.ensure_future(run())
+        return await asyncio.shield(task)
     
     async def search_web(self, query: str, num_results: int = 5) -> List[Dict]:
         """
@@ -34,9 +143,11 @@ class WebSearchCapability:
         Alternative: Use SerpAPI if API key is provided
         """
         if self.api_key:
-            return await self._search_serpapi(query, num_results)
+            fetch = partial(self._search_serpapi, query, num_results)
         else:
-            return await self._search_duckduckgo(query, num_results)
+            fetch = partial(self._search_duckduckgo, query, num_results)
+        # Empty lists are also what errors return, so only non-empty results are cached
+        return await self._cached(self._search_cache, ('search', query, num_results), fetch, bool)
     
     async def _search_duckduckgo(self, query: str, num_results: int) -> List[Dict]:
         """Search using DuckDuckGo HTML"""
@@ -46,21 +157,19 @@ class WebSearchCapability:
         params = {'q': query}
         
         try:
-            async with session.post(url, data=params) as response:
+            async with session.post(url, data=params, headers=BROWSER_HEADERS) as response:
                 html = await response.text()
-                soup = BeautifulSoup(html, 'html.parser')
+                tree = LexborHTMLParser(html)
                 
                 results = []
-                for result in soup.find_all('div', class_='result')[:num_results]:
-                    title_elem = result.find('a', class_='result__a')
-                    snippet_elem = result.find('a', class_='result__snippet')
-                    
-                    if title_elem and snippet_elem:
-                        results.append({
-                            'title': title_elem.get_text(strip=True),
-                            'url': title_elem.get('href', ''),
-                            'snippet': snippet_elem.get_text(strip=True)
-                        })
+                # Rows missing a title or snippet are filtered by the selector itself
+                for result in tree.css(DDG_RESULT_SELECTOR)[:num_results]:
+                    title_elem = result.css_first('a.result__a')
+                    results.append({
+                        'title': title_elem.text(strip=True),
+                        'url': title_elem.attributes.get('href') or '',
+                        'snippet': result.css_first('a.result__snippet').text(strip=True)
+                    })
                 
                 logger.info(f"Found {len(results)} search results for: {query}")
                 return results
@@ -82,7 +191,7 @@ class WebSearchCapability:
         
         try:
             async with session.get(url, params=params) as response:
-                data = await response.json()
+                data = await response.json(loads=json_loads)
                 
                 results = []
                 for result in data.get('organic_results', []):
@@ -100,27 +209,46 @@ class WebSearchCapability:
     
     async def scrape_url(self, url: str) -> Tuple[bool, str]:
         """Scrape content from a URL"""
+        key = ('scrape', urlparse(url).geturl().rstrip('/'))
+        return await self._cached(
+            self._scrape_cache, key, partial(self._scrape_url, url), lambda result: result[0]
+        )
+    
+    async def _scrape_url(self, url: str) -> Tuple[bool, str]:
+        """Fetch and extract a page (uncached)"""
         session = await self._get_session()
         
         try:
-            async with session.get(url, timeout=10) as response:
+            async with session.get(url, headers=BROWSER_HEADERS, timeout=SCRAPE_TIMEOUT) as response:
                 if response.status != 200:
                     return False, f"HTTP {response.status}"
                 
-                html = await response.text()
-                soup = BeautifulSoup(html, 'html.parser')
+                buf = bytearray()
+                async for chunk in response.content.iter_chunked(SCRAPE_CHUNK_SIZE):
+                    buf.extend(chunk)
+                    if len(buf) >= SCRAPE_MAX_BYTES:
+                        break
+                html = buf[:SCRAPE_MAX_BYTES].decode(response.charset or 'utf-8', errors='replace')
+                
+                tree = LexborHTMLParser(html)
                 
                 # Remove script and style elements
-                for script in soup(['script', 'style']):
-                    script.decompose()
+                for node in tree.css('script, style'):
+                    node.decompose()
                 
-                # Get text
-                text = soup.get_text()
+                # Prefer the main content node over navigation, footers and sidebars
+                root = (
+                    tree.css_first('article')
+                    or tree.css_first('main')
+                    or tree.css_first('[role=main]')
+                    or tree.css_first('#content')
+                    or tree.body
+                    or tree.root
+                )
+                text = root.text(separator=' ') if root else ''
                 
-                # Clean up
-                lines = (line.strip() for line in text.splitlines())
-                chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-                text = ' '.join(chunk for chunk in chunks if chunk)
+                # Collapse whitespace runs
+                text = _WS_RE.sub(' ', text).strip()
                 
                 # Limit length
                 if len(text) > 10000:
@@ -129,23 +257,77 @@ class WebSearchCapability:
                 logger.info(f"Scraped {len(text)} characters from {url}")
                 return True, text
         
+        except asyncio.TimeoutError:
+            logger.warning(f"Scraping timed out for {url}")
+            return False, "timeout"
         except Exception as e:
             logger.error(f"Scraping error for {url}: {e}")
             return False, str(e)
     
+    async def batch_scrape(self, urls: List[str], concurrency: int = 16) -> List[Tuple[bool, str]]:
+        """Scrape several URLs concurrently over the shared session, results in input order"""
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def scrape_one(url: str) -> Tuple[bool, str]:
+            async with semaphore:
+                return await self.scrape_url(url)
+        
+        return await asyncio.gather(*(scrape_one(url) for url in urls))
+    
+    async def batch_search(self, queries: List[str], num_results: int = 5, concurrency: int = 4) -> List[List[Dict]]:
+        """
+        Run several searches concurrently over the shared session, results in input order
+        Concurrency is kept low by default since search backends (SerpAPI, DuckDuckGo) rate-limit
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def search_one(query: str) -> List[Dict]:
+            async with semaphore:
+                return await self.search_web(query, num_results)
+        
+        return await asyncio.gather(*(search_one(query) for query in queries))
+    
     async def close(self):
-        """Close the session"""
-        if self.session and not self.session.closed:
-            await self.session.close()
+        """Close the shared session"""
+        await close_shared_session()
 
 
 class GitOperations:
-    """Git operations for code management"""
+    """Git operations for code management (in-process via pygit2 when installed)"""
+    
+    @staticmethod
+    def _pygit2_commit(repo_path: str, message: str) -> Tuple[bool, str]:
+        """Stage everything and commit with libgit2, mirroring `git add . && git commit`"""
+        repo = pygit2.Repository(repo_path)
+        repo.index.add_all()
+        # add_all leaves files deleted from the working tree in the index
+        for path, flags in repo.status().items():
+            if flags & pygit2.GIT_STATUS_WT_DELETED:
+                repo.index.remove(path)
+        repo.index.write()
+        tree = repo.index.write_tree()
+        
+        parents = [] if repo.head_is_unborn else [repo.head.target]
+        if parents and repo[parents[0]].tree_id == tree:
+            return False, "nothing to commit, working tree clean"
+        
+        signature = repo.default_signature
+        oid = repo.create_commit('HEAD', signature, signature, message, tree, parents)
+        branch = repo.head.shorthand
+        return True, f"[{branch} {str(oid)[:7]}] {message}"
     
     @staticmethod
     async def clone_repo(url: str, destination: str) -> Tuple[bool, str]:
-        """Clone a git repository"""
-        import asyncio
+        """Clone a git repository (pygit2 first; the git CLI handles SSH keys and credential helpers)"""
+        if pygit2 is not None:
+            existed = os.path.exists(destination)
+            try:
+                await asyncio.to_thread(pygit2.clone_repository, url, destination)
+                return True, f"Cloned {url} into {destination}"
+            except Exception as e:
+                logger.info(f"pygit2 clone of {url} failed ({e}); retrying with git")
+                if not existed:
+                    shutil.rmtree(destination, ignore_errors=True)
         
         try:
             process = await asyncio.create_subprocess_exec(
@@ -166,7 +348,11 @@ class GitOperations:
     @staticmethod
     async def commit_changes(repo_path: str, message: str) -> Tuple[bool, str]:
         """Commit changes in a git repository"""
-        import asyncio
+        if pygit2 is not None:
+            try:
+                return await asyncio.to_thread(GitOperations._pygit2_commit, repo_path, message)
+            except Exception as e:
+                return False, str(e)
         
         try:
             # Add all changes
@@ -203,9 +389,9 @@ class DataProcessor:
     async def parse_json(content: str) -> Tuple[bool, Dict]:
         """Parse JSON safely"""
         try:
-            data = json.loads(content)
+            data = json_loads(content)
             return True, data
-        except json.JSONDecodeError as e:
+        except json.JSONDecodeError as e:  # orjson.JSONDecodeError subclasses this
             return False, {'error': str(e)}
     
     @staticmethod
@@ -215,38 +401,56 @@ class DataProcessor:
         from io import StringIO
         
         try:
-            reader = csv.DictReader(StringIO(content))
-            data = list(reader)
+            reader = csv.reader(StringIO(content))
+            header = next(reader, None)
+            if header is None:
+                return True, []
+            
+            width = len(header)
+            data = []
+            for row in reader:
+                if not row:
+                    continue
+                record = dict(zip(header, row))
+                # Ragged rows follow csv.DictReader: extras under None, missing fields as None
+                if len(row) > width:
+                    record[None] = row[width:]
+                elif len(row) < width:
+                    for field in header[len(row):]:
+                        record[field] = None
+                data.append(record)
             return True, data
         except Exception as e:
             return False, [{'error': str(e)}]
     
+    @staticmethod
+    async def iter_csv(content: str):
+        """Yield raw CSV rows (header first) without building a dict per row"""
+        import csv
+        from io import StringIO
+        
+        for row in csv.reader(StringIO(content)):
+            yield row
+    
     @staticmethod
     async def extract_code_blocks(text: str) -> List[Dict]:
         """Extract code blocks from markdown text"""
-        pattern = r'```(\w+)?\n(.*?)```'
-        matches = re.findall(pattern, text, re.DOTALL)
-        
-        blocks = []
-        for language, code in matches:
-            blocks.append({
-                'language': language or 'unknown',
-                'code': code.strip()
-            })
-        
-        return blocks
+        return [
+            {'language': language or 'unknown', 'code': code.strip()}
+            for language, code in _CODE_BLOCK_RE.findall(text)
+        ]
     
     @staticmethod
     async def summarize_text(text: str, max_length: int = 500) -> str:
         """Simple text summarization by extracting key sentences"""
-        sentences = text.split('.')
-        
         if len(text) <= max_length:
             return text
         
-        # Take first few and last few sentences
+        # Take first few and last few sentences; bounded splits avoid splitting the whole text
         num_sentences = max(3, max_length // 100)
-        summary_sentences = sentences[:num_sentences] + ['...'] + sentences[-2:]
+        head = text.split('.', num_sentences)[:num_sentences]
+        tail = text.rsplit('.', 2)[-2:]
+        summary_sentences = head + ['...'] + tail
         
         return '. '.join(s.strip() for s in summary_sentences if s.strip())
 
@@ -254,14 +458,39 @@ class DataProcessor:
 class APIIntegrations:
     """Third-party API integrations"""
     
-    def __init__(self):
-        self.session = None
+    def __init__(self, host_concurrency: Optional[Dict[str, int]] = None, max_retries: int = 3):
+        self.host_concurrency = {**DEFAULT_HOST_CONCURRENCY, **(host_concurrency or {})}
+        self.max_retries = max_retries  # Retries after HTTP 429
+        self._host_sems: Dict[str, asyncio.Semaphore] = {}
+        self._host_sems_loop: Optional[asyncio.AbstractEventLoop] = None
     
     async def _get_session(self) -> aiohttp.ClientSession:
-        """Get or create aiohttp session"""
-        if self.session is None or self.session.closed:
-            self.session = aiohttp.ClientSession()
-        return self.session
+        """Get the shared aiohttp session"""
+        return await get_shared_session()
+    
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        """Get the concurrency limiter for a URL's host (semaphores are per event loop)"""
+        loop = asyncio.get_running_loop()
+        if self._host_sems_loop is not loop:
+            self._host_sems = {}
+            self._host_sems_loop = loop
+        
+        host = urlparse(url).hostname or ''
+        semaphore = self._host_sems.get(host)
+        if semaphore is None:
+            limit = self.host_concurrency.get(host, HOST_CONCURRENCY_FALLBACK)
+            semaphore = self._host_sems[host] = asyncio.Semaphore(limit)
+        return semaphore
+    
+    @staticmethod
+    def _retry_delay(retry_after: Optional[str], attempt: int) -> float:
+        """Seconds to wait before retrying a 429: Retry-After if given, else exponential backoff with jitter"""
+        if retry_after:
+            try:
+                return min(float(retry_after), 60.0)
+            except ValueError:
+                pass  # HTTP-date form; use backoff
+        return min(0.5 * 2 ** attempt, 30.0) + random.uniform(0, 0.5)
     
     async def make_request(
         self,
@@ -273,29 +502,41 @@ class APIIntegrations:
     ) -> Tuple[bool, Dict]:
         """Make HTTP request to API"""
         session = await self._get_session()
+        semaphore = self._host_semaphore(url)
         
         try:
-            async with session.request(
-                method,
-                url,
-                headers=headers,
-                json=data,
-                params=params,
-                timeout=30
-            ) as response:
-                result = await response.json()
-                success = 200 <= response.status < 300
+            for attempt in range(self.max_retries + 1):
+                async with semaphore:
+                    async with session.request(
+                        method,
+                        url,
+                        headers=headers,
+                        json=data,
+                        params=params,
+                        timeout=API_TIMEOUT
+                    ) as response:
+                        if response.status != 429 or attempt == self.max_retries:
+                            result = await response.json(loads=json_loads)
+                            success = 200 <= response.status < 300
+                            
+                            return success, result
+                        
+                        delay = self._retry_delay(response.headers.get('Retry-After'), attempt)
                 
-                return success, result
+                # Back off outside the semaphore so other requests to the host can proceed
+                logger.warning(f"Rate limited by {url}, retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
         
+        except asyncio.TimeoutError:
+            logger.warning(f"API request timed out: {url}")
+            return False, {'error': 'timeout'}
         except Exception as e:
             logger.error(f"API request error: {e}")
             return False, {'error': str(e)}
     
     async def close(self):
-        """Close the session"""
-        if self.session and not self.session.closed:
-            await self.session.close()
+        """Close the shared session"""
+        await close_shared_session()
 
 
 class AdvancedCapabilities:
@@ -306,68 +547,112 @@ class AdvancedCapabilities:
         self.git = GitOperations()
         self.data_processor = DataProcessor()
         self.api = APIIntegrations()
+        
+        self._handlers: Dict[str, Callable[[Dict], Awaitable[Tuple[bool, Any]]]] = {
+            'web_search': self._do_web_search,
+            'web_scrape': self._do_web_scrape,
+            'batch_search': self._do_batch_search,
+            'batch_scrape': self._do_batch_scrape,
+            'git_clone': self._do_git_clone,
+            'git_commit': self._do_git_commit,
+            'parse_json': self._do_parse_json,
+            'parse_csv': self._do_parse_csv,
+            'api_request': self._do_api_request,
+        }
     
-    async def execute_advanced_action(self, action_type: str, parameters: Dict) -> Tuple[bool, str]:
-        """Execute advanced action"""
-        try:
-            if action_type == 'web_search':
-                results = await self.web_search.search_web(
-                    parameters.get('query', ''),
-                    parameters.get('num_results', 5)
-                )
-                return True, json.dumps(results, indent=2)
-            
-            elif action_type == 'web_scrape':
-                return await self.web_search.scrape_url(parameters.get('url', ''))
-            
-            elif action_type == 'git_clone':
-                return await self.git.clone_repo(
-                    parameters.get('url', ''),
-                    parameters.get('destination', '')
-                )
-            
-            elif action_type == 'git_commit':
-                return await self.git.commit_changes(
-                    parameters.get('repo_path', ''),
-                    parameters.get('message', 'Auto commit')
-                )
-            
-            elif action_type == 'parse_json':
-                success, data = await self.data_processor.parse_json(
-                    parameters.get('content', '')
-                )
-                return success, json.dumps(data, indent=2)
-            
-            elif action_type == 'parse_csv':
-                success, data = await self.data_processor.parse_csv(
-                    parameters.get('content', '')
-                )
-                return success, json.dumps(data, indent=2)
-            
-            elif action_type == 'api_request':
-                success, data = await self.api.make_request(
-                    url=parameters.get('url', ''),
-                    method=parameters.get('method', 'GET'),
-                    headers=parameters.get('headers'),
-                    data=parameters.get('data'),
-                    params=parameters.get('params')
-                )
-                return success, json.dumps(data, indent=2)
-            
-            else:
-                return False, f"Unknown advanced action: {action_type}"
+    async def _do_web_search(self, parameters: Dict) -> Tuple[bool, List[Dict]]:
+        """Search the web"""
+        results = await self.web_search.search_web(
+            parameters.get('query', ''),
+            parameters.get('num_results', 5)
+        )
+        return True, results
+    
+    async def _do_web_scrape(self, parameters: Dict) -> Tuple[bool, str]:
+        """Scrape a single URL"""
+        return await self.web_search.scrape_url(parameters.get('url', ''))
+    
+    async def _do_batch_search(self, parameters: Dict) -> Tuple[bool, List[Dict]]:
+        """Run several web searches concurrently"""
+        queries = parameters.get('queries', [])
+        results = await self.web_search.batch_search(
+            queries, parameters.get('num_results', 5), parameters.get('concurrency', 4)
+        )
+        return True, [{'query': query, 'results': found} for query, found in zip(queries, results)]
+    
+    async def _do_batch_scrape(self, parameters: Dict) -> Tuple[bool, List[Dict]]:
+        """Scrape several URLs concurrently"""
+        urls = parameters.get('urls', [])
+        results = await self.web_search.batch_scrape(urls, parameters.get('concurrency', 16))
+        return any(success for success, _ in results), [
+            {'url': url, 'success': success, 'content': content}
+            for url, (success, content) in zip(urls, results)
+        ]
+    
+    async def _do_git_clone(self, parameters: Dict) -> Tuple[bool, str]:
+        """Clone a repository"""
+        return await self.git.clone_repo(
+            parameters.get('url', ''),
+            parameters.get('destination', '')
+        )
+    
+    async def _do_git_commit(self, parameters: Dict) -> Tuple[bool, str]:
+        """Commit all changes in a repository"""
+        return await self.git.commit_changes(
+            parameters.get('repo_path', ''),
+            parameters.get('message', 'Auto commit')
+        )
+    
+    async def _do_parse_json(self, parameters: Dict) -> Tuple[bool, Dict]:
+        """Parse JSON content"""
+        return await self.data_processor.parse_json(parameters.get('content', ''))
+    
+    async def _do_parse_csv(self, parameters: Dict) -> Tuple[bool, List[Dict]]:
+        """Parse CSV content"""
+        return await self.data_processor.parse_csv(parameters.get('content', ''))
+    
+    async def _do_api_request(self, parameters: Dict) -> Tuple[bool, Dict]:
+        """Call an HTTP API"""
+        return await self.api.make_request(
+            url=parameters.get('url', ''),
+            method=parameters.get('method', 'GET'),
+            headers=parameters.get('headers'),
+            data=parameters.get('data'),
+            params=parameters.get('params')
+        )
+    
+    def handles(self, action_type: str) -> bool:
+        """Check whether an action type is an advanced action"""
+        return action_type in self._handlers
+    
+    async def execute_advanced_action(self, action_type: str, parameters: Dict) -> Tuple[bool, Union[str, Dict, List]]:
+        """Execute advanced action; structured results are returned as Python objects, not JSON text"""
+        handler = self._handlers.get(action_type)
+        if handler is None:
+            return False, f"Unknown advanced action: {action_type}"
         
+        try:
+            return await handler(parameters)
         except Exception as e:
             logger.error(f"Advanced action error: {e}")
             return False, str(e)
     
     async def close(self):
         """Clean up resources"""
-        await self.web_search.close()
-        await self.api.close()
+        await close_shared_session()
 
 
 # Integration with main orchestrator
+ADVANCED_ACTIONS_PROMPT = """- web_scrape: Extract a page's text {"url": "..."}
+- batch_search: Run several web searches at once {"queries": ["...", "..."], "num_results": 5}
+- batch_scrape: Extract the text of several pages at once {"urls": ["...", "..."]}
+- git_clone: Clone a repository {"url": "...", "destination": "..."}
+- git_commit: Commit all changes in a repository {"repo_path": "...", "message": "..."}
+- parse_json / parse_csv: Parse data {"content": "..."}
+- api_request: Call an HTTP API {"url": "...", "method": "GET", "headers": {}, "data": {}, "params": {}}
+"""
+
+
 def extend_orchestrator_with_advanced_capabilities(orchestrator, web_search_api_key: Optional[str] = None):
     """
     Add advanced capabilities to an existing orchestrator
@@ -380,6 +665,13 @@ def extend_orchestrator_with_advanced_capabilities(orchestrator, web_search_api_
     # Store reference
     orchestrator.advanced = advanced
     
+    # Advertise the advanced actions in the ReAct prompt, after the built-in ones
+    orchestrator.react.system_prompt = orchestrator.react.system_prompt.replace(
+        "- install_dependency: Install required packages\n",
+        "- install_dependency: Install required packages\n" + ADVANCED_ACTIONS_PROMPT,
+        1
+    )
+    
     # Extend execute_action in ReActEngine
     original_execute = orchestrator.react.execute_action
     
@@ -387,9 +679,10 @@ def extend_orchestrator_with_advanced_capabilities(orchestrator, web_search_api_
         action_type = action.action_type
         
         # Check if it's an advanced action
-        if action_type in ['web_search', 'web_scrape', 'git_clone', 'git_commit',
-                          'parse_json', 'parse_csv', 'api_request']:
-            return await advanced.execute_advanced_action(action_type, action.parameters)
+        if advanced.handles(action_type):
+            success, result = await advanced.execute_advanced_action(action_type, action.parameters)
+            # ReAct observations are text; serialize structured results only here
+            return success, result if isinstance(result, str) else json_dumps(result, indent=True)
         
         # Otherwise use original
         return await original_execute(action)
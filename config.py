@@ -2,6 +2,7 @@
 import os
 from typing import Optional
 from dataclasses import dataclass
+from pathlib import Path
 from dotenv import load_dotenv
 
 # Load environment variables immediately
@@ -20,6 +21,7 @@ class LLMConfig:
     base_url: Optional[str] = None
     max_tokens: int = 4096
     temperature: float = 0.7
+    cache_size: int = 0  # Responses kept for exact-repeat prompts (0 disables; opt-in, as sampled replies vary)
 
 @dataclass
 class RAGConfig:
@@ -45,6 +47,8 @@ class ExecutionConfig:
     workspace_path: str
     timeout: int = 300
     max_file_size: int = 10485760  # 10MB
+    trusted_cache: bool = False  # Reuse compiled code objects for repeated snippets
+    max_parallel: int = 8  # Cap on concurrently executing actions in execute_many
 
 class Config:
     def __init__(self):
@@ -58,7 +62,8 @@ class Config:
             api_key=os.getenv("OPENAI_API_KEY"),
             # CORRECTED LINE: Using default value properly
             model=os.getenv("LLM_MODEL", "gpt-4o-mini"),
-            base_url=os.getenv("LLM_BASE_URL")
+            base_url=os.getenv("LLM_BASE_URL"),
+            cache_size=int(os.getenv("LLM_CACHE_SIZE", "0"))
         )
 
         self.rag = RAGConfig(
@@ -78,7 +83,9 @@ class Config:
             max_iterations=int(os.getenv("MAX_ITERATIONS", "10")),
             code_execution_enabled=os.getenv("CODE_EXECUTION_ENABLED", "true").lower() == "true",
             safe_mode=os.getenv("SAFE_MODE", "false").lower() == "true",
-            workspace_path=os.getenv("WORKSPACE_PATH", "./workspace")
+            workspace_path=os.getenv("WORKSPACE_PATH", "./workspace"),
+            trusted_cache=os.getenv("TRUSTED_CODE_CACHE", "false").lower() == "true",
+            max_parallel=int(os.getenv("MAX_PARALLEL_ACTIONS", "8"))
         )
 
         self._validate()
@@ -93,11 +100,11 @@ class Config:
         if self.llm.provider in ["anthropic", "openai"] and not self.llm.api_key:
             raise ValueError(f"LLM_API_KEY (OPENAI_API_KEY) required for {self.llm.provider}")
 
-        # Create directories if they don't exist
-        os.makedirs(self.rag.vector_db_path, exist_ok=True)
-        os.makedirs(self.learning.memory_path, exist_ok=True)
-        os.makedirs(self.execution.workspace_path, exist_ok=True)
-        os.makedirs("./logs", exist_ok=True)
+def ensure_dir(path: str) -> str:
+    """Create a directory if it doesn't exist (called by the subsystem that uses it)"""
+    if not Path(path).is_dir():
+        os.makedirs(path, exist_ok=True)
+    return path
 
 # Global configuration instance
 config = Config()
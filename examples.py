@@ -354,8 +354,17 @@ async def example_monitoring():
 # Run All Examples
 # ============================================================================
 
-async def run_all_examples():
-    """Run all examples"""
+async def _run_example(name, example_func):
+    """Run one example, reporting failure instead of raising"""
+    try:
+        await example_func()
+    except Exception as e:
+        print(f"\n❌ Example '{name}' failed: {e}")
+
+
+async def run_all_examples(pause: bool = True):
+    """Run all examples in order, optionally pausing between them"""
+    # Run serially: each example builds its own orchestrator over the same learning stores
     examples = [
         ("Basic Task", example_basic_task),
         ("Knowledge Ingestion", example_knowledge_ingestion),
@@ -375,12 +384,10 @@ async def run_all_examples():
     print(f"\nTotal examples: {len(examples)}\n")
     
     for name, example_func in examples:
-        try:
-            await example_func()
-        except Exception as e:
-            print(f"\n❌ Example '{name}' failed: {e}")
-        
-        input("\nPress Enter to continue...")
+        await _run_example(name, example_func)
+        if pause:
+            # Read in a thread so the event loop keeps serving background tasks
+            await asyncio.to_thread(input, "\nPress Enter to continue...")
     
     print("\n" + "="*60)
     print("All Examples Complete!")
@@ -412,6 +419,7 @@ Available examples:
     
     print("Choose an option:")
     print("  [a] Run all examples")
+    print("  [p] Run all examples without pauses")
     print("  [1-10] Run specific example")
     print("  [q] Quit")
     
@@ -421,6 +429,8 @@ Available examples:
         return
     elif choice == 'a':
         asyncio.run(run_all_examples())
+    elif choice == 'p':
+        asyncio.run(run_all_examples(pause=False))
     elif choice.isdigit() and 1 <= int(choice) <= 10:
         example_map = {
             1: example_basic_task,
@@ -1,71 +1,215 @@
 """Learning System - Experience Memory and Self-Improvement"""
 import os
 import json
+import atexit
 import logging
+import threading
+import time
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 from collections import defaultdict
 import hashlib
-from config import config
+import uuid
+from config import config, ensure_dir
+from utils import json_dumps, json_dumps_bytes, json_loads
 from rag_system import rag_system
 
 logger = logging.getLogger(__name__)
 
+# Buffered experiences are flushed to experiences.jsonl after this many appends (and at exit)
+EXPERIENCE_FLUSH_EVERY = 16
+
+# patterns.json / playbook.json are rewritten at most this often (seconds); changes made in between
+# are written by a trailing save when the interval ends (or on flush/exit)
+STATE_SAVE_INTERVAL = 0.5
+
+# Strategies kept per task type in the playbook, highest confidence first
+PLAYBOOK_SLOTS = 5
+
+# Hashes of the most recent texts embedded into RAG, kept to skip exact re-adds
+RAG_INDEXED_MAX = 4096
+
 class LearningSystem:
     def __init__(self):
-        self.memory_path = config.learning.memory_path
+        self.memory_path = ensure_dir(config.learning.memory_path)
         self.experiences_file = os.path.join(self.memory_path, "experiences.jsonl")
         self.patterns_file = os.path.join(self.memory_path, "patterns.json")
         self.playbook_file = os.path.join(self.memory_path, "playbook.json")
         
+        # Experience-derived indexes, filled while loading and kept current in _save_experience
+        self._sequence_keys: set = set()
+        self._by_task_and_success: defaultdict = defaultdict(list)
+        
+        # Dirty flags for debounced patterns/playbook saves; a skipped save is retried by a timer.
+        # The lock keeps the timer thread from serializing patterns/playbook mid-update
+        self._patterns_dirty = False
+        self._playbook_dirty = False
+        self._last_state_save = time.monotonic()
+        self._state_lock = threading.RLock()
+        self._save_timer: Optional[threading.Timer] = None
+        
         # Load existing data
         self.experiences = self._load_experiences()
         self.patterns = self._load_patterns()
         self.playbook = self._load_playbook()
+        self._migrate_pattern_aggregates()
+        
+        # Membership indexes; the persisted lists stay the source of truth
+        self._common_action_sets = {
+            task_type: set(pattern["common_actions"])
+            for task_type, pattern in self.patterns["task_patterns"].items()
+        }
+        self._capability_names = {c["name"] for c in self.playbook["capabilities"]}
+        # Hashes of texts recently embedded into the RAG store (persisted in the playbook, bounded)
+        rag_indexed = self.playbook.setdefault("rag_indexed", [])
+        del rag_indexed[:-RAG_INDEXED_MAX]
+        self._rag_seen = set(rag_indexed)
+        self._playbook_hashes = {
+            task_type: {s["hash"] for s in slots}
+            for task_type, slots in self.playbook["strategies"].items()
+        }
+        
+        # Append handle kept open for the process lifetime
+        self._experiences_fp = open(self.experiences_file, 'ab', buffering=1 << 16)
+        self._unflushed = 0
+        atexit.register(self.close)
         
         logger.info(f"Learning system initialized with {len(self.experiences)} experiences")
     
     def _load_experiences(self) -> List[Dict[str, Any]]:
-        """Load all experiences from JSONL file"""
+        """Load all experiences from JSONL file (one read, indexes built in the same pass)"""
         experiences = []
         if os.path.exists(self.experiences_file):
-            with open(self.experiences_file, 'r') as f:
-                for line in f:
-                    try:
-                        experiences.append(json.loads(line))
-                    except json.JSONDecodeError:
-                        continue
+            with open(self.experiences_file, 'rb') as f:
+                data = f.read()
+            for line in data.split(b'\n'):
+                if not line:
+                    continue
+                try:
+                    experience = json_loads(line)
+                except json.JSONDecodeError:
+                    continue
+                experiences.append(experience)
+                self._index_experience(experience)
         return experiences
     
+    def _index_experience(self, experience: Dict[str, Any]):
+        """Add an experience to the in-memory indexes"""
+        self._sequence_keys.add(self._sequence_key(experience["strategy"]))
+        self._by_task_and_success[(experience["task_type"], experience["success"])].append(experience)
+    
     def _load_patterns(self) -> Dict[str, Any]:
         """Load recognized patterns"""
         if os.path.exists(self.patterns_file):
-            with open(self.patterns_file, 'r') as f:
-                return json.load(f)
+            with open(self.patterns_file, 'rb') as f:
+                return json_loads(f.read())
         return {"task_patterns": {}, "failure_patterns": {}}
     
+    def _migrate_pattern_aggregates(self):
+        """Rebuild running success/time totals for patterns saved before they were tracked"""
+        stale = [t for t, p in self.patterns["task_patterns"].items()
+                 if "success_count" not in p or "total_time" not in p]
+        if not stale:
+            return
+        
+        totals = {t: [0, 0.0] for t in stale}
+        for exp in self.experiences:
+            entry = totals.get(exp["task_type"])
+            if entry is not None:
+                entry[0] += bool(exp["success"])
+                entry[1] += exp["execution_time"]
+        
+        for task_type, (success_count, total_time) in totals.items():
+            pattern = self.patterns["task_patterns"][task_type]
+            pattern["success_count"] = success_count
+            pattern["total_time"] = total_time
+        self._save_patterns()
+    
     def _load_playbook(self) -> Dict[str, Any]:
         """Load strategy playbook"""
         if os.path.exists(self.playbook_file):
-            with open(self.playbook_file, 'r') as f:
-                return json.load(f)
+            with open(self.playbook_file, 'rb') as f:
+                playbook = json_loads(f.read())
+            # Re-key entries saved under an older hash function
+            for slots in playbook["strategies"].values():
+                for slot in slots:
+                    slot["hash"] = self._strategy_hash(slot["strategy"])
+            return playbook
         return {"strategies": {}, "capabilities": []}
     
     def _save_experience(self, experience: Dict[str, Any]):
-        """Append experience to JSONL file"""
-        with open(self.experiences_file, 'a') as f:
-            f.write(json.dumps(experience) + '\n')
+        """Append experience to JSONL file (buffered, flushed every EXPERIENCE_FLUSH_EVERY writes)"""
+        self._experiences_fp.write(json_dumps_bytes(experience) + b'\n')
+        self._unflushed += 1
+        if self._unflushed >= EXPERIENCE_FLUSH_EVERY:
+            self.flush()
         self.experiences.append(experience)
+        self._index_experience(experience)
+    
+    def flush(self):
+        """Write buffered experiences and pending patterns/playbook changes to disk"""
+        if not self._experiences_fp.closed:
+            self._experiences_fp.flush()
+        self._unflushed = 0
+        self._save_state()
+    
+    def close(self):
+        """Flush and close the experiences file"""
+        if self._save_timer is not None:
+            self._save_timer.cancel()
+        self._save_state()
+        if not self._experiences_fp.closed:
+            self._experiences_fp.close()
+        self._unflushed = 0
+    
+    def _mark_dirty(self, patterns: bool = False, playbook: bool = False):
+        """
+        Record unsaved changes, writing them out if the last save is older than STATE_SAVE_INTERVAL
+        Otherwise a trailing save is scheduled for when the interval ends
+        """
+        with self._state_lock:
+            self._patterns_dirty |= patterns
+            self._playbook_dirty |= playbook
+            remaining = self._last_state_save + STATE_SAVE_INTERVAL - time.monotonic()
+            if remaining <= 0:
+                self._save_state()
+            elif self._save_timer is None:
+                self._save_timer = threading.Timer(remaining, self._save_state)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+    
+    def _save_state(self):
+        """Write out patterns/playbook if they have unsaved changes"""
+        with self._state_lock:
+            if self._save_timer is not None and self._save_timer is not threading.current_thread():
+                self._save_timer.cancel()
+            self._save_timer = None
+            if self._patterns_dirty:
+                self._save_patterns()
+            if self._playbook_dirty:
+                self._save_playbook()
+            self._patterns_dirty = self._playbook_dirty = False
+            self._last_state_save = time.monotonic()
+    
+    @staticmethod
+    def _write_atomic(path: str, data: bytes):
+        """Write a file via a temp file and rename, so readers never see a partial write"""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
     
     def _save_patterns(self):
         """Save patterns to file"""
-        with open(self.patterns_file, 'w') as f:
-            json.dump(self.patterns, f, indent=2)
+        self._write_atomic(self.patterns_file, json_dumps_bytes(self.patterns))
     
     def _save_playbook(self):
         """Save playbook to file"""
-        with open(self.playbook_file, 'w') as f:
-            json.dump(self.playbook, f, indent=2)
+        self._write_atomic(self.playbook_file, json_dumps_bytes(self.playbook))
+    
+    def dump_pretty(self) -> str:
+        """Indented JSON of the current patterns and playbook, for debugging (files are stored compact)"""
+        return json_dumps({"patterns": self.patterns, "playbook": self.playbook}, indent=True)
     
     def store_experience(self, 
                         task_type: str,
@@ -79,7 +223,7 @@ class LearningSystem:
         Store a learning experience
         Returns experience ID
         """
-        experience_id = hashlib.md5(f"{task_type}{datetime.now().isoformat()}".encode()).hexdigest()
+        experience_id = uuid.uuid4().hex
         
         experience = {
             "id": experience_id,
@@ -91,29 +235,48 @@ class LearningSystem:
             "context": context,
             "failure_reason": failure_reason,
             "timestamp": datetime.now().isoformat(),
-            "confidence_score": self._calculate_confidence(strategy, success)
+            "confidence_score": self._calculate_confidence(len(strategy), success)
         }
         
         self._save_experience(experience)
         
         # Auto-learn if enabled
         if config.learning.auto_learn:
-            self._update_patterns(experience)
+            with self._state_lock:
+                self._update_patterns(experience)
             if success:
-                self._update_playbook(experience)
-                # Add to RAG for semantic retrieval
-                rag_system.add_text(
-                    f"Task: {query}\nStrategy: {json.dumps(strategy)}\nOutcome: Success",
-                    metadata={"type": "experience", "task_type": task_type, "experience_id": experience_id}
-                )
+                # Add to RAG for semantic retrieval; only an identical query + strategy text is skipped
+                strategy_json = json_dumps(strategy)
+                text = f"Task: {query}\nStrategy: {strategy_json}\nOutcome: Success"
+                text_hash = hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+                index = text_hash not in self._rag_seen
+                if index:
+                    rag_system.add_text(
+                        text,
+                        metadata={"type": "experience", "task_type": task_type, "experience_id": experience_id,
+                                  "strategy_json": strategy_json}
+                    )
+                with self._state_lock:
+                    if index:
+                        self._remember_rag_text(text_hash)
+                    self._update_playbook(experience, self._strategy_hash(strategy))
         
         logger.info(f"Stored experience {experience_id}: {task_type} - {'success' if success else 'failure'}")
         return experience_id
     
-    def _calculate_confidence(self, strategy: List[Dict[str, Any]], success: bool) -> float:
+    def _remember_rag_text(self, text_hash: str):
+        """Record an embedded text, forgetting the oldest beyond RAG_INDEXED_MAX"""
+        rag_indexed = self.playbook["rag_indexed"]
+        rag_indexed.append(text_hash)
+        self._rag_seen.add(text_hash)
+        if len(rag_indexed) > RAG_INDEXED_MAX:
+            self._rag_seen.discard(rag_indexed.pop(0))
+    
+    @staticmethod
+    def _calculate_confidence(strategy_len: int, success: bool) -> float:
         """Calculate confidence score based on strategy complexity and outcome"""
         base_score = 0.8 if success else 0.2
-        complexity_factor = min(len(strategy) / 10.0, 0.2)  # More steps = lower confidence
+        complexity_factor = min(strategy_len / 10.0, 0.2)  # More steps = lower confidence
         return max(0.0, min(1.0, base_score - complexity_factor))
     
     def _update_patterns(self, experience: Dict[str, Any]):
@@ -125,28 +288,28 @@ class LearningSystem:
                 "count": 0,
                 "success_rate": 0.0,
                 "common_actions": [],
-                "avg_execution_time": 0.0
+                "avg_execution_time": 0.0,
+                "success_count": 0,
+                "total_time": 0.0
             }
         
         pattern = self.patterns["task_patterns"][task_type]
         pattern["count"] += 1
         
-        # Update success rate
-        total_successes = sum(1 for exp in self.experiences 
-                            if exp["task_type"] == task_type and exp["success"])
-        pattern["success_rate"] = total_successes / pattern["count"]
+        # Update success rate and average execution time from running totals
+        pattern["success_count"] += int(bool(experience["success"]))
+        pattern["total_time"] += experience["execution_time"]
+        pattern["success_rate"] = pattern["success_count"] / pattern["count"]
+        pattern["avg_execution_time"] = pattern["total_time"] / pattern["count"]
         
         # Update common actions
+        known_actions = self._common_action_sets.setdefault(task_type, set(pattern["common_actions"]))
         for action in experience["strategy"]:
             action_type = action.get("action_type", "unknown")
-            if action_type not in pattern["common_actions"]:
+            if action_type not in known_actions:
+                known_actions.add(action_type)
                 pattern["common_actions"].append(action_type)
         
-        # Update average execution time
-        total_time = sum(exp["execution_time"] for exp in self.experiences 
-                        if exp["task_type"] == task_type)
-        pattern["avg_execution_time"] = total_time / pattern["count"]
-        
         # Track failure patterns
         if not experience["success"] and experience.get("failure_reason"):
             failure_key = f"{task_type}:{experience['failure_reason']}"
@@ -154,9 +317,9 @@ class LearningSystem:
                 self.patterns["failure_patterns"][failure_key] = 0
             self.patterns["failure_patterns"][failure_key] += 1
         
-        self._save_patterns()
+        self._mark_dirty(patterns=True)
     
-    def _update_playbook(self, experience: Dict[str, Any]):
+    def _update_playbook(self, experience: Dict[str, Any], strategy_hash: Optional[str] = None):
         """Add successful strategies to playbook"""
         task_type = experience["task_type"]
         confidence = experience["confidence_score"]
@@ -166,41 +329,56 @@ class LearningSystem:
                 self.playbook["strategies"][task_type] = []
             
             # Add strategy if it's novel or better than existing
-            strategy_hash = hashlib.md5(json.dumps(experience["strategy"], sort_keys=True).encode()).hexdigest()
+            if strategy_hash is None:
+                strategy_hash = self._strategy_hash(experience["strategy"])
             
-            existing = [s for s in self.playbook["strategies"][task_type] if s["hash"] == strategy_hash]
-            if not existing:
-                self.playbook["strategies"][task_type].append({
+            known_hashes = self._playbook_hashes.setdefault(task_type, set())
+            slots = self.playbook["strategies"][task_type]
+            # Slots stay sorted, so a full playbook only admits strategies beating the last one
+            full = len(slots) >= PLAYBOOK_SLOTS
+            if strategy_hash not in known_hashes and not (full and confidence <= slots[-1]["confidence"]):
+                index = next((i for i, s in enumerate(slots) if s["confidence"] < confidence), len(slots))
+                slots.insert(index, {
                     "hash": strategy_hash,
                     "strategy": experience["strategy"],
                     "confidence": confidence,
                     "execution_time": experience["execution_time"],
                     "query_example": experience["query"]
                 })
-                
-                # Keep only top 5 strategies per task type
-                self.playbook["strategies"][task_type] = sorted(
-                    self.playbook["strategies"][task_type],
-                    key=lambda x: x["confidence"],
-                    reverse=True
-                )[:5]
+                known_hashes.add(strategy_hash)
+                if len(slots) > PLAYBOOK_SLOTS:
+                    known_hashes.discard(slots.pop()["hash"])
         
-        self._save_playbook()
+        self._mark_dirty(playbook=True)
     
     def get_relevant_experiences(self, query: str, task_type: Optional[str] = None, limit: int = 5) -> List[Dict[str, Any]]:
         """Get relevant past experiences using semantic search"""
-        # Use RAG for semantic retrieval
-        rag_results = rag_system.search(query, n_results=limit, filter_metadata={"type": "experience"})
-        
-        # Also get by task type if specified
+        # Get by task type if specified; enough matches there skips the embedding and vector search
         relevant = []
         if task_type:
-            relevant = [exp for exp in self.experiences 
-                       if exp["task_type"] == task_type and exp["success"]][-limit:]
+            relevant = self._by_task_and_success[(task_type, True)][-limit:]
+            if len(relevant) >= limit:
+                return relevant
         
-        # Combine and deduplicate
-        combined = relevant + [json.loads(r["text"].split("Strategy: ")[1].split("\nOutcome:")[0]) 
-                              for r in rag_results if r not in relevant]
+        # Use RAG for semantic retrieval
+        rag_results = rag_system.search(query, n_results=limit, filter_metadata={"type": "experience"})
+        
+        # Combine and deduplicate (chunks of one experience share its experience_id)
+        combined = list(relevant)
+        seen_ids = {exp["id"] for exp in relevant}
+        for r in rag_results:
+            metadata = r["metadata"]
+            experience_id = metadata.get("experience_id")
+            if experience_id in seen_ids:
+                continue
+            seen_ids.add(experience_id)
+            try:
+                if "strategy_json" in metadata:
+                    combined.append(json_loads(metadata["strategy_json"]))
+                else:  # Entries added before the strategy was kept in metadata
+                    combined.append(json_loads(r["text"].split("Strategy: ")[1].split("\nOutcome:")[0]))
+            except (ValueError, IndexError):
+                continue
         
         return combined[:limit]
     
@@ -260,14 +438,19 @@ class LearningSystem:
         
         return reflection
     
+    @staticmethod
+    def _strategy_hash(strategy: List[Dict[str, Any]]) -> str:
+        """Content hash of a strategy, used to deduplicate playbook entries"""
+        return hashlib.blake2b(json_dumps_bytes(strategy, sort_keys=True), digest_size=16).hexdigest()
+    
+    @staticmethod
+    def _sequence_key(strategy: List[Dict[str, Any]]) -> str:
+        """Action-type sequence of a strategy, as stored in the novelty index"""
+        return "->".join(a.get("action_type", "") for a in strategy)
+    
     def _is_novel_sequence(self, sequence: List[str]) -> bool:
         """Check if action sequence is novel"""
-        sequence_str = "->".join(sequence)
-        for exp in self.experiences:
-            exp_sequence = "->".join([a.get("action_type", "") for a in exp["strategy"]])
-            if exp_sequence == sequence_str:
-                return False
-        return True
+        return "->".join(sequence) not in self._sequence_keys
     
     def register_capability(self, capability: str, description: str):
         """Register a new capability that the system has learned"""
@@ -277,10 +460,12 @@ class LearningSystem:
             "registered_at": datetime.now().isoformat()
         }
         
-        if capability not in [c["name"] for c in self.playbook["capabilities"]]:
-            self.playbook["capabilities"].append(capability_entry)
-            self._save_playbook()
-            logger.info(f"Registered new capability: {capability}")
+        with self._state_lock:
+            if capability not in self._capability_names:
+                self._capability_names.add(capability)
+                self.playbook["capabilities"].append(capability_entry)
+                self._mark_dirty(playbook=True)
+                logger.info(f"Registered new capability: {capability}")
     
     def get_capabilities(self) -> List[Dict[str, Any]]:
         """Get list of registered capabilities"""
@@ -289,7 +474,7 @@ class LearningSystem:
     def get_statistics(self) -> Dict[str, Any]:
         """Get learning system statistics"""
         total = len(self.experiences)
-        successful = sum(1 for exp in self.experiences if exp["success"])
+        successful = sum(len(exps) for (_, success), exps in self._by_task_and_success.items() if success)
         
         return {
             "total_experiences": total,
@@ -1,15 +1,96 @@
 """LLM Interface - Supports Anthropic, OpenAI, and Local Models"""
+import asyncio
+import copy
+import functools
+import hashlib
 import json
 import logging
-from typing import List, Dict, Any, Optional
+import re
+import threading
+from typing import List, Dict, Any, Optional, Tuple
 from abc import ABC, abstractmethod
 import anthropic
+import httpx
 import openai
-import requests
+from cachetools import LRUCache
 from config import config
+from utils import json_dumps_bytes, json_loads
+
+try:
+    import msgspec
+except ImportError:  # msgspec is optional; Ollama responses are then decoded in full
+    msgspec = None
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on concurrent provider requests issued through generate_async
+LLM_MAX_CONCURRENT = 32
+
+_JSON_OPEN_RE = re.compile(r'[\[{]')
+_JSON_TOKEN_RE = re.compile(r'["\\\[\]{}]')  # Only quotes, escapes and brackets affect nesting
+
+def _extract_json(text: str, start: int = 0) -> Optional[Tuple[int, int]]:
+    """Span of the first balanced {...} or [...] at or after start, honouring string literals"""
+    match = _JSON_OPEN_RE.search(text, start)
+    if match is None:
+        return None
+    
+    begin = match.start()
+    depth = 0
+    in_string = False
+    skip_to = -1
+    for token in _JSON_TOKEN_RE.finditer(text, begin):
+        i = token.start()
+        if i < skip_to:
+            continue
+        char = token.group()
+        if in_string:
+            if char == '\\':
+                skip_to = i + 2  # Escaped character can't close the string
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in '[{':
+            depth += 1
+        elif char in ']}':
+            depth -= 1
+            if depth == 0:
+                return begin, i + 1
+    return None
+
+def _parse_json_response(text: str) -> Any:
+    """Parse the first JSON object/array in an LLM response (a ```json fence is searched first)"""
+    fence = text.find("```json")
+    pos = fence + 7 if fence != -1 else 0
+    while (span := _extract_json(text, pos)) is not None:
+        begin, end = span
+        try:
+            return json_loads(text[begin:end])
+        except json.JSONDecodeError:
+            pos = begin + 1  # Not valid JSON (e.g. "[note]"); try the next opening bracket
+    raise json.JSONDecodeError("No JSON value found", text, 0)
+
+class _UnparsedResponse(dict):
+    """{"response": text} fallback for a structured completion that held no JSON (never cached)"""
+
+@functools.lru_cache(maxsize=64)
+def _system_message(system: str) -> Dict[str, str]:
+    """Shared system message dict for a prompt (treated as read-only)"""
+    return {"role": "system", "content": system}
+
+def _with_system(messages: List[Dict[str, str]], system: Optional[str]) -> List[Dict[str, str]]:
+    """Prepend the system message unless the list already leads with one (see build_messages)"""
+    if not system or (messages and messages[0]["role"] == "system"):
+        return messages
+    return [_system_message(system), *messages]
+
+def _split_system(messages: List[Dict[str, str]], system: Optional[str]) -> Tuple[List[Dict[str, str]], str]:
+    """Move a leading system message out of the list, for APIs that take it separately"""
+    if messages and messages[0]["role"] == "system":
+        return messages[1:], system or messages[0]["content"]
+    return messages, system or ""
+
 class LLMProvider(ABC):
     @abstractmethod
     def generate(self, messages: List[Dict[str, str]], system: Optional[str] = None) -> str:
@@ -18,19 +99,40 @@ class LLMProvider(ABC):
     @abstractmethod
     def generate_structured(self, messages: List[Dict[str, str]], system: Optional[str] = None) -> Dict[str, Any]:
         pass
+    
+    async def agenerate(self, messages: List[Dict[str, str]], system: Optional[str] = None) -> str:
+        """Async generate; providers without an async client run the sync call in a thread"""
+        return await asyncio.to_thread(self.generate, messages, system)
 
 class AnthropicProvider(LLMProvider):
     def __init__(self):
         self.client = anthropic.Anthropic(api_key=config.llm.api_key)
+        self.async_client = anthropic.AsyncAnthropic(api_key=config.llm.api_key)
         self.model = config.llm.model
         
     def generate(self, messages: List[Dict[str, str]], system: Optional[str] = None) -> str:
         try:
+            messages, system = _split_system(messages, system)
             response = self.client.messages.create(
                 model=self.model,
                 max_tokens=config.llm.max_tokens,
                 temperature=config.llm.temperature,
-                system=system or "",
+                system=system,
+                messages=messages
+            )
+            return response.content[0].text
+        except Exception as e:
+            logger.error(f"Anthropic API error: {e}")
+            raise
+    
+    async def agenerate(self, messages: List[Dict[str, str]], system: Optional[str] = None) -> str:
+        try:
+            messages, system = _split_system(messages, system)
+            response = await self.async_client.messages.create(
+                model=self.model,
+                max_tokens=config.llm.max_tokens,
+                temperature=config.llm.temperature,
+                system=system,
                 messages=messages
             )
             return response.content[0].text
@@ -41,25 +143,20 @@ class AnthropicProvider(LLMProvider):
     def generate_structured(self, messages: List[Dict[str, str]], system: Optional[str] = None) -> Dict[str, Any]:
         response_text = self.generate(messages, system)
         try:
-            # Extract JSON from response
-            if "```json" in response_text:
-                json_str = response_text.split("```json")[1].split("```")[0].strip()
-            else:
-                json_str = response_text.strip()
-            return json.loads(json_str)
+            return _parse_json_response(response_text)
         except json.JSONDecodeError:
             logger.warning("Failed to parse structured response, returning as text")
-            return {"response": response_text}
+            return _UnparsedResponse(response=response_text)
 
 class OpenAIProvider(LLMProvider):
     def __init__(self):
         self.client = openai.OpenAI(api_key=config.llm.api_key)
+        self.async_client = openai.AsyncOpenAI(api_key=config.llm.api_key)
         self.model = config.llm.model
         
     def generate(self, messages: List[Dict[str, str]], system: Optional[str] = None) -> str:
         try:
-            if system:
-                messages = [{"role": "system", "content": system}] + messages
+            messages = _with_system(messages, system)
             
             response = self.client.chat.completions.create(
                 model=self.model,
@@ -72,42 +169,88 @@ class OpenAIProvider(LLMProvider):
             logger.error(f"OpenAI API error: {e}")
             raise
     
+    async def agenerate(self, messages: List[Dict[str, str]], system: Optional[str] = None) -> str:
+        try:
+            messages = _with_system(messages, system)
+            
+            response = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                max_tokens=config.llm.max_tokens,
+                temperature=config.llm.temperature
+            )
+            return response.choices[0].message.content
+        except Exception as e:
+            logger.error(f"OpenAI API error: {e}")
+            raise
+    
     def generate_structured(self, messages: List[Dict[str, str]], system: Optional[str] = None) -> Dict[str, Any]:
         response_text = self.generate(messages, system)
         try:
-            if "```json" in response_text:
-                json_str = response_text.split("```json")[1].split("```")[0].strip()
-            else:
-                json_str = response_text.strip()
-            return json.loads(json_str)
+            return _parse_json_response(response_text)
         except json.JSONDecodeError:
-            return {"response": response_text}
+            return _UnparsedResponse(response=response_text)
+
+if msgspec is not None:
+    class _OllamaMessage(msgspec.Struct):
+        content: str
+    
+    class _OllamaChatResponse(msgspec.Struct):
+        message: _OllamaMessage
+    
+    # Typed decoder: only message.content is materialized, other fields are skipped
+    _ollama_decoder = msgspec.json.Decoder(_OllamaChatResponse)
+
+def _ollama_content(body: bytes) -> str:
+    """Assistant text from an Ollama /api/chat response body"""
+    if msgspec is not None:
+        return _ollama_decoder.decode(body).message.content
+    return json_loads(body)["message"]["content"]
 
 class LocalProvider(LLMProvider):
     def __init__(self):
         self.base_url = config.llm.base_url or "http://localhost:11434"
         self.model = config.llm.model
+        # Keep-alive pools; the async client is bound to the loop it was created on
+        self._limits = httpx.Limits(max_keepalive_connections=16)
+        self._client = httpx.Client(base_url=self.base_url, timeout=300, limits=self._limits)
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._async_client_loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def _chat_payload(self, messages: List[Dict[str, str]], system: Optional[str]) -> Dict[str, Any]:
+        """Request body for Ollama's /api/chat"""
+        return {
+            "model": self.model,
+            "messages": _with_system(messages, system),
+            "stream": False,
+            "options": {
+                "temperature": config.llm.temperature,
+                "num_predict": config.llm.max_tokens
+            }
+        }
+    
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """Get or create the async client for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client_loop is not loop:
+            self._async_client = httpx.AsyncClient(base_url=self.base_url, timeout=300, limits=self._limits)
+            self._async_client_loop = loop
+        return self._async_client
         
     def generate(self, messages: List[Dict[str, str]], system: Optional[str] = None) -> str:
         try:
-            if system:
-                messages = [{"role": "system", "content": system}] + messages
-            
-            response = requests.post(
-                f"{self.base_url}/api/chat",
-                json={
-                    "model": self.model,
-                    "messages": messages,
-                    "stream": False,
-                    "options": {
-                        "temperature": config.llm.temperature,
-                        "num_predict": config.llm.max_tokens
-                    }
-                },
-                timeout=300
-            )
+            response = self._client.post("/api/chat", json=self._chat_payload(messages, system))
+            response.raise_for_status()
+            return _ollama_content(response.content)
+        except Exception as e:
+            logger.error(f"Local LLM error: {e}")
+            raise
+    
+    async def agenerate(self, messages: List[Dict[str, str]], system: Optional[str] = None) -> str:
+        try:
+            response = await self._get_async_client().post("/api/chat", json=self._chat_payload(messages, system))
             response.raise_for_status()
-            return response.json()["message"]["content"]
+            return _ollama_content(response.content)
         except Exception as e:
             logger.error(f"Local LLM error: {e}")
             raise
@@ -115,18 +258,25 @@ class LocalProvider(LLMProvider):
     def generate_structured(self, messages: List[Dict[str, str]], system: Optional[str] = None) -> Dict[str, Any]:
         response_text = self.generate(messages, system)
         try:
-            if "```json" in response_text:
-                json_str = response_text.split("```json")[1].split("```")[0].strip()
-            else:
-                json_str = response_text.strip()
-            return json.loads(json_str)
+            return _parse_json_response(response_text)
         except json.JSONDecodeError:
-            return {"response": response_text}
+            return _UnparsedResponse(response=response_text)
 
 class LLMInterface:
     def __init__(self):
         self.provider = self._get_provider()
         
+        # Exact-prompt caches: completions as text, structured completions as parsed dicts
+        cache_size = config.llm.cache_size
+        self._response_cache = LRUCache(maxsize=cache_size) if cache_size else None
+        self._structured_cache = LRUCache(maxsize=cache_size) if cache_size else None
+        self._cache_lock = threading.Lock()
+        
+        # generate_async state, bound to the running event loop
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._async_slots: Optional[asyncio.Semaphore] = None
+        self._inflight: Dict[bytes, asyncio.Task] = {}
+        
     def _get_provider(self) -> LLMProvider:
         provider_map = {
             "anthropic": AnthropicProvider,
@@ -140,14 +290,74 @@ class LLMInterface:
         
         return provider_class()
     
+    @staticmethod
+    def _cache_key(messages: List[Dict[str, str]], system: Optional[str]) -> bytes:
+        """Digest of the full prompt (system + messages)"""
+        return hashlib.blake2b(json_dumps_bytes([system or "", messages]), digest_size=16).digest()
+    
+    def _cached_call(self, cache: Optional[LRUCache], messages, system, call):
+        """Return a cached result for an identical prompt, or call the provider and cache it"""
+        if cache is None:
+            return call(messages, system)
+        
+        key = self._cache_key(messages, system)
+        with self._cache_lock:
+            result = cache.get(key)
+        if result is None:
+            result = call(messages, system)
+            if not isinstance(result, _UnparsedResponse):
+                with self._cache_lock:
+                    cache[key] = result
+        return result
+    
     def generate(self, messages: List[Dict[str, str]], system: Optional[str] = None) -> str:
-        return self.provider.generate(messages, system)
+        return self._cached_call(self._response_cache, messages, system, self.provider.generate)
     
     def generate_structured(self, messages: List[Dict[str, str]], system: Optional[str] = None) -> Dict[str, Any]:
-        return self.provider.generate_structured(messages, system)
+        result = self._cached_call(self._structured_cache, messages, system, self.provider.generate_structured)
+        # Callers may mutate the dict; keep the cached copy pristine
+        return copy.deepcopy(result) if self._structured_cache is not None else result
+    
+    async def generate_async(self, messages: List[Dict[str, str]], system: Optional[str] = None) -> str:
+        """
+        Async generate for concurrent callers
+        Identical prompts already in flight share one provider request; at most LLM_MAX_CONCURRENT run at once
+        """
+        key = self._cache_key(messages, system)
+        if self._response_cache is not None:
+            with self._cache_lock:
+                cached = self._response_cache.get(key)
+            if cached is not None:
+                return cached
+        
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            self._async_loop = loop
+            self._async_slots = asyncio.Semaphore(LLM_MAX_CONCURRENT)
+            self._inflight = {}
+        
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = loop.create_task(self._agenerate_uncached(key, messages, system))
+        return await asyncio.shield(task)
+    
+    async def _agenerate_uncached(self, key: bytes, messages: List[Dict[str, str]], system: Optional[str]) -> str:
+        """Issue one provider request and cache its completion"""
+        try:
+            async with self._async_slots:
+                result = await self.provider.agenerate(messages, system)
+            if self._response_cache is not None:
+                with self._cache_lock:
+                    self._response_cache[key] = result
+            return result
+        finally:
+            self._inflight.pop(key, None)
     
-    def build_messages(self, history: List[Dict[str, str]], new_message: str) -> List[Dict[str, str]]:
-        """Build message list maintaining conversation history"""
-        return history + [{"role": "user", "content": new_message}]
+    def build_messages(self, history: List[Dict[str, str]], new_message: str,
+                       system: Optional[str] = None) -> List[Dict[str, str]]:
+        """Build message list maintaining conversation history (system message first when given)"""
+        if system:
+            return [_system_message(system), *history, {"role": "user", "content": new_message}]
+        return [*history, {"role": "user", "content": new_message}]
 
 llm = LLMInterface()
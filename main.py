@@ -1,12 +1,16 @@
 """Main Telegram Bot - ALO Interface"""
 import logging
 import asyncio
-import json
+import atexit
+import queue
+import io
 import os
+import re
+from logging.handlers import QueueHandler, QueueListener
 from typing import Optional
-from datetime import datetime
 # NOTE: load_dotenv is now ONLY handled in config.py for cleanliness.
 
+from cachetools import TTLCache
 from telegram import Update
 from telegram.ext import (
     Application,
@@ -16,43 +20,125 @@ from telegram.ext import (
     ContextTypes
 )
 from telegram.constants import ParseMode
+from telegram.error import TelegramError
+from telegram.request import HTTPXRequest
 
 # --- EXTERNAL MODULES (Ensure these files exist in your directory!) ---
-from config import config
+from config import config, ensure_dir
+from utils import json_dumps_bytes
 from react_engine import react_engine
-# Placeholders for undefined modules:
-from rag_system import rag_system
-from learning_system import learning_system
-from action_executor import action_executor
+# rag_system / learning_system load the embedding model and are imported on first use (see ALOBot._get_rag)
 # --------------------------------------------------------------------
 
-# Setup logging
-logging.basicConfig(
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    level=logging.INFO,
-    handlers=[
-        logging.FileHandler('./logs/alo.log'),
-        logging.StreamHandler()
-    ]
-)
+# Setup logging: handlers only enqueue records; file/console writes happen on the listener thread
+ensure_dir('./logs')
+_log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+_log_handlers = [logging.FileHandler('./logs/alo.log'), logging.StreamHandler()]
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)
+_log_queue = queue.SimpleQueue()
+_root_logger = logging.getLogger()
+_root_logger.setLevel(logging.INFO)
+_root_logger.addHandler(QueueHandler(_log_queue))
+_log_listener = QueueListener(_log_queue, *_log_handlers, respect_handler_level=True)
+_log_listener.start()
+atexit.register(_log_listener.stop)  # Drains queued records on exit
 logger = logging.getLogger(__name__)
 
+# Tasks finishing within this many seconds get a single reply instead of "Processing..." + edit
+FAST_TASK_SECONDS = 0.8
+
+# Minimum seconds between edits of a task's status message (Telegram allows about one per second per chat)
+STATUS_EDIT_INTERVAL = 1.1
+
+# Characters with meaning in Telegram's (legacy) Markdown; user text is escaped before interpolation
+_MD_ESCAPE = re.compile(r'([_*`\[])')
+
+def _escape_markdown(text: str) -> str:
+    """Escape user-provided text for ParseMode.MARKDOWN messages"""
+    return _MD_ESCAPE.sub(r'\\\1', text)
+
+# /status body; the static config section is appended from ALOBot._status_config_text
+_STATUS_TEMPLATE = """📊 *System Status*
+*RAG System:*
+• {total_chunks:,} chunks indexed
+• Model: {embedding_model}
+
+*Learning System:*
+• {total_experiences} experiences
+• {success_rate:.1%} success rate
+• {unique_task_types} task types
+• {strategies_in_playbook} strategies
+
+*Capabilities:*
+{capabilities}
+
+"""
+
+class RateLimitedEditor:
+    """A task's status message; progress edits are coalesced to at most one per min_interval"""
+
+    def __init__(self, update: Update, min_interval: float = STATUS_EDIT_INTERVAL):
+        self._update = update
+        self._min_interval = min_interval
+        self.message = None
+        self._pending = None
+        self._last_edit = 0.0
+        self._drainer = None
+
+    def update(self, text: str):
+        """Queue a progress edit; if a newer one arrives before it is sent, only the newer is shown"""
+        self._pending = text
+        if self.message is not None and (self._drainer is None or self._drainer.done()):
+            self._drainer = asyncio.create_task(self._drain())
+
+    async def _wait_turn(self):
+        delay = self._last_edit + self._min_interval - asyncio.get_running_loop().time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self._last_edit = asyncio.get_running_loop().time()
+
+    async def _drain(self):
+        while self._pending is not None:
+            await self._wait_turn()
+            text, self._pending = self._pending, None
+            try:
+                await self.message.edit_text(text, parse_mode=ParseMode.MARKDOWN)
+            except TelegramError as e:
+                logger.warning(f"Progress update failed: {e}")
+
+    async def open(self, text: str):
+        """Send the status message, showing the latest queued progress instead of text if there is one"""
+        await self.send(self._pending or text)
+
+    async def send(self, text: str):
+        """Show text now, replacing queued progress: edit the status message, or reply if there is none yet"""
+        self._pending = None
+        if self._drainer is not None and not self._drainer.done():
+            self._drainer.cancel()
+        # Not rate-limited: final results shouldn't wait behind the progress interval
+        if self.message is None:
+            self.message = await self._update.message.reply_text(text, parse_mode=ParseMode.MARKDOWN)
+        else:
+            await self.message.edit_text(text, parse_mode=ParseMode.MARKDOWN)
+        self._last_edit = asyncio.get_running_loop().time()
+
 class ALOBot:
     def __init__(self):
         self.app = None
-        self.active_tasks = {}  # Track ongoing tasks by chat_id
-
-    def is_admin(self, user_id: int) -> bool:
-        """Check if user is admin"""
-        return user_id == config.telegram.admin_id
+        self.active_tasks = {}  # Running asyncio.Task per chat_id (for /cancel)
+        self._chat_locks = {}  # asyncio.Lock per chat_id, held while that chat's task runs
+        self._rag = None
+        self._learning = None
+        self._stats_cache = TTLCache(maxsize=1, ttl=5.0)  # Rendered /status, refreshed at most every 5s
 
-    async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Handle /start command"""
-        welcome_message = """🤖 *Autonomous Learning Orchestrator (ALO)*
+        # Static replies, built once (config is fixed for the process lifetime)
+        self._welcome_text = """🤖 *Autonomous Learning Orchestrator (ALO)*
 I'm an AI agent that can execute complex tasks through reasoning and action.                                    
 *Commands:* • `/task [description]` - Execute a task
 • `/learn [source]` - Add knowledge from file/URL       
 • `/status` - Current system status
+• `/cancel` - Cancel the running task
 • `/memory` - Query past learnings                      
 • `/config` - View configuration
 • `/help` - Show this message                           
@@ -60,41 +146,89 @@ I'm an AI agent that can execute complex tasks through reasoning and action.
 • `/task Search for recent AI papers and summarize findings`                                                    
 • `/task Clone my GitHub repo and run tests`            
 I learn from every interaction to get better over time!"""
-        await update.message.reply_text(welcome_message, parse_mode=ParseMode.MARKDOWN)
+        self._config_text = f"""⚙️ *Configuration*
+
+*LLM:*
+• Provider: {config.llm.provider}
+• Model: {config.llm.model}
+• Max tokens: {config.llm.max_tokens}
+
+*Execution:*
+• Max iterations: {config.execution.max_iterations}
+• Code execution: {'Enabled' if config.execution.code_execution_enabled else 'Disabled'}
+• Safe mode: {'ON' if config.execution.safe_mode else 'OFF'}
+• Timeout: {config.execution.timeout}s
+
+*Learning:*
+• Auto-learn: {'ON' if config.learning.auto_learn else 'OFF'}
+• Reflection: {'ON' if config.learning.reflection_enabled else 'OFF'}
+
+*Paths:*
+• Workspace: {config.execution.workspace_path}
+• Vector DB: {config.rag.vector_db_path}
+• Memory: {config.learning.memory_path}
+"""
+        self._status_config_text = f"""*Config:*
+• LLM: {config.llm.provider} / {config.llm.model}
+• Max iterations: {config.execution.max_iterations}
+• Safe mode: {'ON' if config.execution.safe_mode else 'OFF'}
+• Auto-learn: {'ON' if config.learning.auto_learn else 'OFF'}
+"""
+
+    async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /start command"""
+        await update.message.reply_text(self._welcome_text, parse_mode=ParseMode.MARKDOWN)
 
     async def task_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):                                   
         """Handle /task command"""                              
         chat_id = update.effective_chat.id
-        
-        if not self.is_admin(update.effective_user.id):             
-            await update.message.reply_text("⛔ Unauthorized. This bot is restricted to admin only.")                       
-            return
+        reply = update.message.reply_text
         
         # Check if react_engine initialized (e.g., if API key was missing)
         if react_engine is None:
-            await update.message.reply_text("💥 System Error: LLM engine failed to initialize. Check logs for missing API key.")
+            await reply("💥 System Error: LLM engine failed to initialize. Check logs for missing API key.")
             return
 
         # Get task description                                  
-        task_text = " ".join(context.args) if context.args else ""
+        args = context.args
+        task_text = " ".join(args) if args else ""
         if not task_text:                                           
-            await update.message.reply_text("⚠️ Please provide a task description.\n\nExample: `/task Create a web scraper for news articles`")                                      
+            await reply("⚠️ Please provide a task description.\n\nExample: `/task Create a web scraper for news articles`")                                      
             return                                                                                                      
         # Check if task already running                         
-        if chat_id in self.active_tasks:
-            await update.message.reply_text("⏳ A task is already running. Please wait for it to complete.")                
+        lock = self._chat_locks.setdefault(chat_id, asyncio.Lock())
+        if lock.locked():
+            await reply("⏳ A task is already running. Please wait for it to complete.")                
             return                                      
+        # An uncontended acquire doesn't yield, so a concurrent /task for this chat sees the lock held
+        await lock.acquire()
         
-        self.active_tasks[chat_id] = True                                                                               
-        # Send initial response                                 
-        status_msg = await update.message.reply_text(               
-            f"🚀 *Task Started*\n\n{task_text}\n\n_Processing..._",                                                         
-            parse_mode=ParseMode.MARKDOWN                       
-        )
-        
+        # Run in the background so other commands stay responsive
+        task = context.application.create_task(self._run_task(update, task_text), update=update)
+        self.active_tasks[chat_id] = task
+        # Released on completion, including cancellation before the task got to run
+        task.add_done_callback(lambda _: self._finish_task(chat_id, lock))
+
+    def _finish_task(self, chat_id: int, lock: asyncio.Lock):
+        """Forget a chat's finished task and let it start another"""
+        self.active_tasks.pop(chat_id, None)
+        lock.release()
+
+    async def _run_task(self, update: Update, task_text: str):
+        """Execute a task and report the result (scheduled by task_command)"""
+        status = RateLimitedEditor(update)
+        started = f"🚀 *Task Started*\n\n{_escape_markdown(task_text)}\n\n"
+        task = None
         try:
-            # Execute task                                          
-            result = await react_engine.execute_task(task_text)                                                                                                                     
+            # Execute task; the initial response is only sent if it doesn't finish quickly
+            task = asyncio.create_task(react_engine.execute_task(
+                task_text, progress=lambda step: status.update(f"{started}_{_escape_markdown(step)}_")
+            ))
+            done, _ = await asyncio.wait({task}, timeout=FAST_TASK_SECONDS)
+            if task not in done:
+                await status.open(f"{started}_Processing..._")
+            result = await task
+            
             # Format response                                       
             if result.get("success"):                                   
                 response = f"✅ *Task Completed*\n\n{result.get('response', 'Done')}\n\n"
@@ -106,105 +240,117 @@ I learn from every interaction to get better over time!"""
                 if result.get('suggestion'):                                
                     response += f"💡 {result['suggestion']}"                                                                                                                        
             
-            await status_msg.edit_text(response, parse_mode=ParseMode.MARKDOWN)                                                                                                     
+            await status.send(response)
             # Optionally send history as file if verbose            
             if result.get('history') and len(result['history']) > 5:
-                # Code to save and send history file (unchanged)
-                history_file = f"/tmp/task_history_{chat_id}_{int(datetime.now().timestamp())}.json"                            
-                with open(history_file, 'w') as f:                          
-                    json.dump(result['history'], f, indent=2)                                                                                                                           
+                # Serialized in memory and uploaded directly; no temp file
+                history = json_dumps_bytes(result['history'], indent=True)
                 await update.message.reply_document(
-                    document=open(history_file, 'rb'),                      
+                    document=io.BytesIO(history),
                     filename="task_history.json",                           
                     caption="📋 Detailed execution history"                                                                     
-                )                                                       
-                os.remove(history_file)                                                                                 
+                )
+        except asyncio.CancelledError:
+            if task is not None:
+                task.cancel()
+            await status.send("🛑 *Task Cancelled*")
+            raise
         except Exception as e:                                      
             logger.error(f"Task execution error: {e}", exc_info=True)                                                       
-            await status_msg.edit_text(                                 
-                f"💥 *Error*\n\n{str(e)[:500]}",                        
-                parse_mode=ParseMode.MARKDOWN                       
-            )
-        finally:                                                    
-            self.active_tasks.pop(chat_id, None)                                                                    
-
-    # NOTE: The rest of the command handlers (/learn, /status, /memory, /config, etc.) 
-    #       remain unchanged from your original provided code. They are omitted here for brevity.
-    #       You must include them in your final main.py file.
-    
+            await status.send(f"💥 *Error*\n\n{str(e)[:500]}")
+
+    async def cancel_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /cancel command"""
+        task = self.active_tasks.get(update.effective_chat.id)
+        if task is None:
+            await update.message.reply_text("No task is running.")
+            return
+        task.cancel()
+
+    def _get_rag(self):
+        """Import the RAG system on first use"""
+        if self._rag is None:
+            from rag_system import rag_system
+            self._rag = rag_system
+        return self._rag
+
+    def _get_learning(self):
+        """Import the learning system on first use"""
+        if self._learning is None:
+            from learning_system import learning_system
+            self._learning = learning_system
+        return self._learning
+
+    def _get_rag_stats(self) -> dict:
+        """RAG statistics, or empty counts if the RAG system can't be loaded"""
+        try:
+            return self._get_rag().get_stats()
+        except Exception as e:
+            logger.warning(f"RAG stats unavailable: {e}")
+            return {'total_chunks': 0, 'embedding_model': config.rag.embedding_model}
+
+    def _get_learning_stats(self) -> tuple:
+        """Learning statistics and capabilities, or empty values if the learning system can't be loaded"""
+        try:
+            learning = self._get_learning()
+            return learning.get_statistics(), learning.get_capabilities()
+        except Exception as e:
+            logger.warning(f"Learning stats unavailable: {e}")
+            return {'total_experiences': 0, 'success_rate': 0, 'unique_task_types': 0, 'strategies_in_playbook': 0}, []
+
+    def _collect_stats(self) -> tuple:
+        """RAG stats, learning stats and capabilities for /status (blocking)"""
+        return (self._get_rag_stats(), *self._get_learning_stats())
+
     async def learn_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /learn command"""
-        if not self.is_admin(update.effective_user.id):
-            await update.message.reply_text("⛔ Unauthorized")
+        source = " ".join(context.args) if context.args else ""
+        if not source:
+            await update.message.reply_text("⚠️ Please provide a file path or text to learn.\n\nExample: `/learn ./docs/guide.md`",
+                                            parse_mode=ParseMode.MARKDOWN)
             return
-        
-        # ... (rest of /learn logic - requires rag_system, action_executor) ...
-        await update.message.reply_text("The /learn command is not fully functional without rag_system and action_executor.")
+
+        # First use imports the embedding model; keep that and the indexing off the event loop
+        rag = await asyncio.to_thread(self._get_rag)
+        if os.path.isfile(source):
+            chunks = await asyncio.to_thread(rag.add_file, source)
+        else:
+            chunks = await asyncio.to_thread(rag.add_text, source, {"type": "telegram"})
+        await update.message.reply_text(f"📚 Added {chunks} chunks to knowledge base")
         
     async def status_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /status command"""
-        if not self.is_admin(update.effective_user.id):
-            return
-        
-        # Get statistics
-        # NOTE: Using dummy data since rag_system and learning_system are undefined
-        rag_stats = {'total_chunks': 1234, 'embedding_model': config.rag.embedding_model}
-        learning_stats = {'total_experiences': 50, 'success_rate': 0.85, 'unique_task_types': 5, 'strategies_in_playbook': 10}
-        capabilities = [{'name': 'File I/O'}, {'name': 'Web Search'}] 
-        
-        status = f"""📊 *System Status*
-*RAG System:*
-• {rag_stats['total_chunks']:,} chunks indexed
-• Model: {rag_stats['embedding_model']}
-
-*Learning System:*
-• {learning_stats['total_experiences']} experiences
-• {learning_stats['success_rate']:.1%} success rate
-• {learning_stats['unique_task_types']} task types
-• {learning_stats['strategies_in_playbook']} strategies
-
-*Capabilities:*
-{chr(10).join([f"• {cap['name']}" for cap in capabilities[:10]])}
-
-*Config:*
-• LLM: {config.llm.provider} / {config.llm.model}
-• Max iterations: {config.execution.max_iterations}
-• Safe mode: {'ON' if config.execution.safe_mode else 'OFF'}
-• Auto-learn: {'ON' if config.learning.auto_learn else 'OFF'}
-"""
+        # Rendered text is cached with the statistics it was built from
+        status = self._stats_cache.get('status')
+        if status is None:
+            rag_stats, learning_stats, capabilities = await asyncio.to_thread(self._collect_stats)
+            status = _STATUS_TEMPLATE.format_map({
+                **rag_stats,
+                **learning_stats,
+                "capabilities": "\n".join(f"• {cap['name']}" for cap in capabilities[:10]),
+            }) + self._status_config_text
+            self._stats_cache['status'] = status
         await update.message.reply_text(status, parse_mode=ParseMode.MARKDOWN)
 
     async def memory_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /memory command"""
-        # ... (rest of /memory logic - requires rag_system) ...
-        await update.message.reply_text("The /memory command is not fully functional without rag_system.")
+        query = " ".join(context.args) if context.args else ""
+        if not query:
+            await update.message.reply_text("⚠️ Please provide a search query.\n\nExample: `/memory web scraping`",
+                                            parse_mode=ParseMode.MARKDOWN)
+            return
+
+        rag = await asyncio.to_thread(self._get_rag)
+        results = await asyncio.to_thread(rag.search, query)
+        if not results:
+            await update.message.reply_text("🔍 No relevant memories found.")
+            return
+        lines = [f"{i}. ({r['similarity']:.0%}) {r['text'][:200]}" for i, r in enumerate(results, 1)]
+        await update.message.reply_text("🧠 Relevant memories:\n\n" + "\n\n".join(lines))
 
     async def config_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /config command"""
-        # ... (rest of /config logic - remains unchanged) ...
-        cfg = f"""⚙️ *Configuration*
-
-*LLM:*
-• Provider: {config.llm.provider}
-• Model: {config.llm.model}
-• Max tokens: {config.llm.max_tokens}
-
-*Execution:*
-• Max iterations: {config.execution.max_iterations}
-• Code execution: {'Enabled' if config.execution.code_execution_enabled else 'Disabled'}
-• Safe mode: {'ON' if config.execution.safe_mode else 'OFF'}
-• Timeout: {config.execution.timeout}s
-
-*Learning:*
-• Auto-learn: {'ON' if config.learning.auto_learn else 'OFF'}
-• Reflection: {'ON' if config.learning.reflection_enabled else 'OFF'}
-
-*Paths:*
-• Workspace: {config.execution.workspace_path}
-• Vector DB: {config.rag.vector_db_path}
-• Memory: {config.learning.memory_path}
-"""
-        await update.message.reply_text(cfg, parse_mode=ParseMode.MARKDOWN)
+        await update.message.reply_text(self._config_text, parse_mode=ParseMode.MARKDOWN)
 
     async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /help command"""
@@ -212,9 +358,6 @@ I learn from every interaction to get better over time!"""
 
     async def handle_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle regular messages"""
-        if not self.is_admin(update.effective_user.id):
-            return
-
         # Treat regular messages as tasks
         await update.message.reply_text(
             "💡 Tip: Use `/task` command for clearer task execution.\n\n"
@@ -226,18 +369,30 @@ I learn from every interaction to get better over time!"""
         """Start the bot"""
         logger.info("Starting ALO Telegram Bot...")
 
-        # Create application
-        self.app = Application.builder().token(config.telegram.bot_token).build()
+        # Create application; bot API calls from concurrent handlers share a pooled HTTP/2 client,
+        # long polling gets its own connection so it never waits behind replies
+        request = HTTPXRequest(connection_pool_size=64, pool_timeout=5.0, http_version="2")
+        get_updates_request = HTTPXRequest(http_version="2")
+        self.app = (
+            Application.builder()
+            .token(config.telegram.bot_token)
+            .request(request)
+            .get_updates_request(get_updates_request)
+            .concurrent_updates(True)
+            .build()
+        )
 
-        # Add handlers
-        self.app.add_handler(CommandHandler("start", self.start_command))
-        self.app.add_handler(CommandHandler("help", self.help_command))
-        self.app.add_handler(CommandHandler("task", self.task_command))
-        self.app.add_handler(CommandHandler("learn", self.learn_command))
-        self.app.add_handler(CommandHandler("status", self.status_command))
-        self.app.add_handler(CommandHandler("memory", self.memory_command))
-        self.app.add_handler(CommandHandler("config", self.config_command))
-        self.app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, self.handle_message))
+        # Add handlers; updates from anyone but the admin are dropped by the filter before dispatch
+        admin_filter = filters.User(user_id=config.telegram.admin_id)
+        self.app.add_handler(CommandHandler("start", self.start_command, filters=admin_filter))
+        self.app.add_handler(CommandHandler("help", self.help_command, filters=admin_filter))
+        self.app.add_handler(CommandHandler("task", self.task_command, filters=admin_filter))
+        self.app.add_handler(CommandHandler("cancel", self.cancel_command, filters=admin_filter))
+        self.app.add_handler(CommandHandler("learn", self.learn_command, filters=admin_filter))
+        self.app.add_handler(CommandHandler("status", self.status_command, filters=admin_filter))
+        self.app.add_handler(CommandHandler("memory", self.memory_command, filters=admin_filter))
+        self.app.add_handler(CommandHandler("config", self.config_command, filters=admin_filter))
+        self.app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND & admin_filter, self.handle_message))
 
         # Start bot
         logger.info("Bot started successfully")
@@ -245,6 +400,13 @@ I learn from every interaction to get better over time!"""
 
 
 if __name__ == "__main__":
+    # Faster event loop when available; run_polling picks up the installed policy
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
     # Graceful check before starting the bot
     if react_engine is None:
         # The initialization failure was already logged in react_engine.py
@@ -4,22 +4,37 @@ Production-ready ReAct agent with RAG and self-improvement capabilities
 """
 
 import os
+import re
+import copy
 import json
 import asyncio
+import sqlite3
+import struct
 import hashlib
+import functools
+import threading
 import subprocess
+import time
 import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple, Union
 from dataclasses import dataclass, asdict
 from pathlib import Path
 import logging
 
 import anthropic
+import numpy as np
+from cachetools import LRUCache, TTLCache
+import torch
+import sentence_transformers
 from sentence_transformers import SentenceTransformer
 import chromadb
 from chromadb.config import Settings
 
+from utils import json_dumps, json_dumps_bytes, json_loads
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -32,20 +47,25 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def _isoformat_from_ns(ns: int) -> str:
+    """Format a time.time_ns() timestamp as a local ISO-8601 string"""
+    return datetime.fromtimestamp(ns / 1e9).isoformat()
+
+
 @dataclass
 class Action:
     """Represents an executable action"""
     action_type: str
     parameters: Dict[str, Any]
-    timestamp: datetime = None
+    timestamp: Optional[int] = None  # time.time_ns(); formatted only on serialization
     
     def __post_init__(self):
         if self.timestamp is None:
-            self.timestamp = datetime.now()
+            self.timestamp = time.time_ns()
     
     def to_dict(self) -> Dict:
         data = asdict(self)
-        data['timestamp'] = self.timestamp.isoformat()
+        data['timestamp'] = _isoformat_from_ns(self.timestamp)
         return data
 
 
@@ -72,27 +92,104 @@ class Learning:
         return Learning(**data)
 
 
+# Long-lived interpreter for execute_python. Requests are ">I" length-prefixed code on a private
+# copy of stdin; replies are ">BII" (ok, stdout size, stderr size) plus both outputs on a private copy
+# of stdout. During a run fds 1 and 2 point at temp files, so prints and child-process output are
+# captured without touching the protocol pipes; fd 0 is /dev/null and cwd is restored afterwards.
+PYTHON_RUNNER_STUB = r"""
+import os, struct, sys, tempfile, traceback
+requests = os.fdopen(os.dup(0), 'rb')
+replies = os.fdopen(os.dup(1), 'wb')
+devnull = os.open(os.devnull, os.O_RDWR)
+for fd in (0, 1, 2):
+    os.dup2(devnull, fd)
+home = os.getcwd()
+limit = int(sys.argv[1])
+
+def read_exact(n):
+    data = requests.read(n)
+    if len(data) < n:
+        sys.exit(0)
+    return data
+
+def captured(f):
+    f.seek(0)
+    data = f.read(limit + 1)
+    return data[:limit] + b'\n... (truncated)' if len(data) > limit else data
+
+while True:
+    (size,) = struct.unpack('>I', read_exact(4))
+    code = read_exact(size).decode()
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        os.dup2(out.fileno(), 1)
+        os.dup2(err.fileno(), 2)
+        ok = True
+        try:
+            exec(compile(code, '<execute_python>', 'exec'), {'__name__': '__main__'})
+        except SystemExit as e:
+            ok = e.code in (None, 0)
+        except BaseException:
+            traceback.print_exc()
+            ok = False
+        finally:
+            sys.stdout, sys.stderr, sys.stdin = sys.__stdout__, sys.__stderr__, sys.__stdin__
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.dup2(devnull, 1)
+            os.dup2(devnull, 2)
+            os.chdir(home)
+        stdout, stderr = captured(out), captured(err)
+    replies.write(struct.pack('>BII', ok, len(stdout), len(stderr)) + stdout + stderr)
+    replies.flush()
+"""
+
+
 class SecureExecutor:
     """Secure execution environment with sandboxing"""
     
-    def __init__(self, workspace_path: str, safe_mode: bool = False):
+    DANGEROUS_COMMANDS = ('rm -rf /', 'dd if=', 'mkfs', ':(){:|:&};:', 'fork bomb')
+    # One case-insensitive pass over the command instead of lower() plus a scan per pattern
+    _DANGER_RE = re.compile('|'.join(map(re.escape, DANGEROUS_COMMANDS)), re.IGNORECASE)
+    MAX_READ_BYTES = 10 * 1024 * 1024
+    PYTHON_WORKER_MAX_RUNS = 50
+    PYTHON_WORKER_TIMEOUT = 300.0
+    PYTHON_OUTPUT_MAX_BYTES = 1024 * 1024
+    
+    def __init__(self, workspace_path: str, safe_mode: bool = False,
+                 audit_path: Optional[str] = None, audit_max: int = 10000):
         self.workspace_path = Path(workspace_path)
         self.workspace_path.mkdir(parents=True, exist_ok=True)
         self.safe_mode = safe_mode
-        self.audit_log = []
+        self._py_worker: Optional[asyncio.subprocess.Process] = None
+        self._py_worker_runs = 0
+        self._py_worker_lock = asyncio.Lock()
+        
+        # Recent entries stay in memory (timestamps are time.time_ns(); see export_audit_log);
+        # the full trail goes to an optional NDJSON file through a 64 KiB write buffer
+        self.audit_log = deque(maxlen=audit_max)
+        self._audit_file = None
+        if audit_path:
+            Path(audit_path).parent.mkdir(parents=True, exist_ok=True)
+            self._audit_file = open(audit_path, 'ab', buffering=1 << 16)
         
     def audit(self, action: str, parameters: Dict, result: str, success: bool):
         """Log all actions for security audit"""
         entry = {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': time.time_ns(),
             'action': action,
             'parameters': parameters,
             'result': result[:500],  # Truncate long results
             'success': success
         }
         self.audit_log.append(entry)
+        if self._audit_file is not None:
+            self._audit_file.write(json_dumps_bytes(entry) + b'\n')
         logger.info(f"AUDIT: {action} - Success: {success}")
     
+    def export_audit_log(self) -> List[Dict]:
+        """Audit log entries with ISO-formatted timestamps"""
+        return [{**entry, 'timestamp': _isoformat_from_ns(entry['timestamp'])} for entry in self.audit_log]
+    
     def validate_path(self, path: str) -> bool:
         """Ensure path is within workspace"""
         try:
@@ -104,10 +201,8 @@ class SecureExecutor:
     async def execute_bash(self, command: str) -> Tuple[bool, str]:
         """Execute bash command with safety checks"""
         # Block dangerous commands in safe mode
-        if self.safe_mode:
-            dangerous = ['rm -rf /', 'dd if=', 'mkfs', ':(){:|:&};:', 'fork bomb']
-            if any(d in command.lower() for d in dangerous):
-                return False, "Command blocked by safe mode"
+        if self.safe_mode and self._DANGER_RE.search(command):
+            return False, "Command blocked by safe mode"
         
         try:
             process = await asyncio.create_subprocess_shell(
@@ -129,7 +224,75 @@ class SecureExecutor:
             return False, error
     
     async def execute_python(self, code: str) -> Tuple[bool, str]:
-        """Execute Python code in isolated environment"""
+        """Execute Python code (fresh interpreter in safe mode, warm worker otherwise)"""
+        if self.safe_mode:
+            return await self._execute_python_isolated(code)
+        
+        try:
+            async with self._py_worker_lock:
+                success, output = await self._run_in_worker(code)
+            self.audit('python_execute', {'code': code[:200]}, output, success)
+            return success, output
+        except Exception as e:
+            error = str(e)
+            self.audit('python_execute', {'code': code[:200]}, error, False)
+            return False, error
+    
+    async def _run_in_worker(self, code: str) -> Tuple[bool, str]:
+        """Run code on the warm interpreter, recycling it after failures or PYTHON_WORKER_MAX_RUNS runs"""
+        if self._py_worker is None or self._py_worker.returncode is not None:
+            self._py_worker = await asyncio.create_subprocess_exec(
+                'python3', '-u', '-c', PYTHON_RUNNER_STUB, str(self.PYTHON_OUTPUT_MAX_BYTES),
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+                cwd=str(self.workspace_path)
+            )
+            self._py_worker_runs = 0
+        
+        try:
+            success, stdout, stderr = await asyncio.wait_for(
+                self._worker_round_trip(self._py_worker, code.encode()), self.PYTHON_WORKER_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            await self._stop_worker()
+            return False, "Execution timed out"
+        except Exception:
+            # Worker died (os._exit, crash) or the pipe broke; the next call spawns a fresh one
+            await self._stop_worker()
+            return False, "Python worker exited unexpectedly"
+        
+        self._py_worker_runs += 1
+        if not success or self._py_worker_runs >= self.PYTHON_WORKER_MAX_RUNS:
+            await self._stop_worker()
+        return success, stdout.decode(errors='replace') + stderr.decode(errors='replace')
+    
+    @staticmethod
+    async def _worker_round_trip(worker: asyncio.subprocess.Process, payload: bytes) -> Tuple[bool, bytes, bytes]:
+        """Send one code frame and read the reply frame"""
+        worker.stdin.write(struct.pack('>I', len(payload)) + payload)
+        await worker.stdin.drain()
+        ok, stdout_len, stderr_len = struct.unpack('>BII', await worker.stdout.readexactly(9))
+        body = await worker.stdout.readexactly(stdout_len + stderr_len)
+        return bool(ok), body[:stdout_len], body[stdout_len:]
+    
+    async def _stop_worker(self):
+        """Terminate the warm Python worker"""
+        worker, self._py_worker = self._py_worker, None
+        if worker is not None and worker.returncode is None:
+            worker.kill()
+            await worker.wait()
+    
+    async def close(self):
+        """Stop background interpreters and flush the audit file"""
+        async with self._py_worker_lock:
+            await self._stop_worker()
+        if self._audit_file is not None:
+            self._audit_file.close()
+            self._audit_file = None
+    
+    async def _execute_python_isolated(self, code: str) -> Tuple[bool, str]:
+        """Execute Python code in a fresh interpreter"""
         # Create temporary file
         code_hash = hashlib.sha256(code.encode()).hexdigest()[:8]
         code_file = self.workspace_path / f"temp_{code_hash}.py"
@@ -168,15 +331,32 @@ class SecureExecutor:
             if not path.exists():
                 return False, "File not found"
             
-            content = path.read_text()
-            self.audit('file_read', {'filepath': filepath}, f"Read {len(content)} chars", True)
+            # Bounded binary read (+1 byte to detect truncation), decoded once
+            with path.open('rb') as f:
+                raw = f.read(self.MAX_READ_BYTES + 1)
+            data = raw[:self.MAX_READ_BYTES]
+            content = data.decode('utf-8', errors='replace')
+            if len(raw) > self.MAX_READ_BYTES:
+                content += "\n... (truncated)"
+            self.audit('file_read', {'filepath': filepath}, f"Read {len(data)} bytes", True)
             return True, content
         except Exception as e:
             error = str(e)
             self.audit('file_read', {'filepath': filepath}, error, False)
             return False, error
     
-    async def write_file(self, filepath: str, content: str) -> Tuple[bool, str]:
+    @staticmethod
+    def _write_bytes(path: Path, data: bytes):
+        """Write bytes with raw os.write calls, resuming after partial writes"""
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+    
+    async def write_file(self, filepath: str, content: Union[str, bytes]) -> Tuple[bool, str]:
         """Write file with path validation"""
         if not self.validate_path(filepath):
             return False, "Path outside workspace"
@@ -184,10 +364,11 @@ class SecureExecutor:
         try:
             path = Path(filepath)
             path.parent.mkdir(parents=True, exist_ok=True)
-            path.write_text(content)
+            data = content if isinstance(content, bytes) else content.encode()
+            self._write_bytes(path, data)
             
-            self.audit('file_write', {'filepath': filepath}, f"Wrote {len(content)} chars", True)
-            return True, f"Wrote {len(content)} characters to {filepath}"
+            self.audit('file_write', {'filepath': filepath}, f"Wrote {len(data)} bytes", True)
+            return True, f"Wrote {len(data)} bytes to {filepath}"
         except Exception as e:
             error = str(e)
             self.audit('file_write', {'filepath': filepath}, error, False)
@@ -197,13 +378,64 @@ class SecureExecutor:
 class RAGSystem:
     """Vector database and retrieval system"""
     
-    def __init__(self, db_path: str, embedding_model: str, chunk_size: int = 512, chunk_overlap: int = 50):
+    # Oldest stored chunk embeddings are evicted beyond this many rows
+    EMBEDDING_STORE_MAX_ROWS = 200_000
+    
+    def __init__(self, db_path: str, embedding_model: str, chunk_size: int = 512, chunk_overlap: int = 50,
+                 embed_batch_size: int = 64, backend: str = 'torch',
+                 hnsw_m: int = 24, hnsw_ef_construction: int = 128, hnsw_ef_search: int = 100,
+                 in_memory: bool = False):
         self.db_path = Path(db_path)
         self.db_path.mkdir(parents=True, exist_ok=True)
         
-        self.embedding_model = SentenceTransformer(embedding_model)
+        self.embedding_model_name = embedding_model
+        self.embedding_backend = self._resolve_backend(backend)
+        self.embedding_model = self._load_embedding_model(embedding_model, self.embedding_backend)
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.embed_batch_size = embed_batch_size
+        
+        # Repeated queries (e.g. every ReAct iteration) skip the embedder and Chroma;
+        # the collection version in the key invalidates results on add_document
+        self._cache_lock = threading.RLock()
+        self._query_cache = TTLCache(maxsize=1024, ttl=300)
+        self._embedding_cache = LRUCache(maxsize=1024)
+        self._collection_versions: Dict[str, int] = {}
+        
+        # Embedding and Chroma calls block; run them off the event loop on a bounded pool
+        self._io_exec = ThreadPoolExecutor(max_workers=2, thread_name_prefix='rag')
+        
+        # Optional in-memory float32 copy of each collection, searched with a single BLAS matrix-vector
+        # product instead of a Chroma round-trip; loaded lazily on a collection's first query
+        self.in_memory = in_memory
+        self._memory_lock = threading.Lock()
+        self._memory_index: Dict[str, Dict[str, Any]] = {}
+        
+        # HNSW index parameters for new collections (cosine on normalized embeddings; older L2 collections
+        # are rebuilt on open); graph writes are batched and persisted every sync_threshold additions
+        self.hnsw_metadata = {
+            'hnsw:space': 'cosine',
+            'hnsw:M': hnsw_m,
+            'hnsw:construction_ef': hnsw_ef_construction,
+            'hnsw:search_ef': hnsw_ef_search,
+            'hnsw:batch_size': 100,
+            'hnsw:sync_threshold': 1000
+        }
+        
+        # Persistent content-hash -> float32 vector store, keyed by model and backend (their vectors
+        # differ slightly); re-ingested chunks skip the embedder. Superseded float16 table is dropped.
+        self._embedding_store_key = f"{embedding_model}|{self.embedding_backend}"
+        if self.embedding_backend == 'torch' and torch.cuda.is_available():
+            self._embedding_store_key += '|fp16'
+        self._embedding_store_lock = threading.Lock()
+        self._embedding_store = sqlite3.connect(str(self.db_path / 'embedding_cache.sqlite'), check_same_thread=False)
+        self._embedding_store.execute('DROP TABLE IF EXISTS emb_cache')
+        self._embedding_store.execute(
+            'CREATE TABLE IF NOT EXISTS embeddings ('
+            'model TEXT NOT NULL, hash TEXT NOT NULL, vec BLOB NOT NULL, PRIMARY KEY (model, hash))'
+        )
+        self._embedding_store.commit()
+        self._embedding_store_rows = self._embedding_store.execute('SELECT COUNT(*) FROM embeddings').fetchone()[0]
         
         # Initialize ChromaDB
         self.client = chromadb.PersistentClient(
@@ -221,47 +453,277 @@ class RAGSystem:
         
         logger.info("RAG system initialized")
     
+    @staticmethod
+    def _resolve_backend(backend: str) -> str:
+        """Backend actually used: onnx falls back to torch on older sentence-transformers"""
+        if backend == 'onnx' and not RAGSystem._supports_onnx_backend():
+            logger.warning(
+                f"EMBEDDING_BACKEND=onnx needs sentence-transformers>=3.2 "
+                f"(installed: {sentence_transformers.__version__}); using torch"
+            )
+            return 'torch'
+        return backend
+    
+    @staticmethod
+    def _load_embedding_model(model_name: str, backend: str) -> SentenceTransformer:
+        """Load the embedder: INT8 ONNX Runtime, or torch (FP16 when CUDA is available)"""
+        if backend == 'onnx':
+            return SentenceTransformer(
+                model_name,
+                backend='onnx',
+                model_kwargs={'file_name': 'onnx/model_qint8_avx512_vnni.onnx'}
+            )
+        
+        model = SentenceTransformer(model_name)
+        if torch.cuda.is_available():
+            model = model.half().to('cuda')
+        return model
+    
+    @staticmethod
+    def _supports_onnx_backend() -> bool:
+        """Whether the installed sentence-transformers accepts backend='onnx' (added in 3.2)"""
+        try:
+            major, minor = (int(part) for part in sentence_transformers.__version__.split('.')[:2])
+        except ValueError:
+            return False
+        return (major, minor) >= (3, 2)
+    
+    def _encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """Encode texts to normalized float32 embeddings"""
+        with torch.inference_mode():
+            embeddings = self.embedding_model.encode(
+                texts,
+                batch_size=batch_size,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=False
+            )
+        return embeddings.astype(np.float32, copy=False)
+    
+    async def _run_blocking(self, func, *args, **kwargs):
+        """Run a blocking call on the RAG thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._io_exec, functools.partial(func, *args, **kwargs))
+    
     def _get_or_create_collection(self, name: str):
-        """Get or create a collection"""
+        """Get or create a collection, rebuilding ones created before the cosine space"""
         try:
-            return self.client.get_collection(name)
+            collection = self.client.get_collection(name)
         except:
-            return self.client.create_collection(name)
+            return self.client.create_collection(name, metadata=self.hnsw_metadata)
+        
+        if (collection.metadata or {}).get('hnsw:space', 'l2') != self.hnsw_metadata['hnsw:space']:
+            collection = self._rebuild_collection(collection)
+        return collection
+    
+    def _rebuild_collection(self, old, page_size: int = 1000):
+        """
+        Copy a collection into one with the current HNSW metadata (the space is fixed at creation)
+        Stored embeddings are reused; the old collection is only dropped once the copy is complete
+        """
+        name = old.name
+        logger.info(f"Rebuilding collection {name} with {self.hnsw_metadata['hnsw:space']} distance")
+        staging = f"{name}__rebuild"
+        try:
+            self.client.delete_collection(staging)  # Left over from an interrupted rebuild
+        except Exception:
+            pass
+        new = self.client.create_collection(staging, metadata=self.hnsw_metadata)
+        
+        offset = 0
+        while True:
+            page = old.get(include=['embeddings', 'documents', 'metadatas'], limit=page_size, offset=offset)
+            if not page['ids']:
+                break
+            new.add(ids=page['ids'], embeddings=page['embeddings'], documents=page['documents'],
+                    metadatas=page['metadatas'])
+            offset += len(page['ids'])
+        
+        self.client.delete_collection(name)
+        new.modify(name=name)
+        return new
     
     def chunk_text(self, text: str) -> List[str]:
         """Split text into overlapping chunks"""
-        chunks = []
-        start = 0
+        step = self.chunk_size - self.chunk_overlap
+        return [text[start:start + self.chunk_size] for start in range(0, len(text), step)]
+    
+    def embed_chunks(self, chunks: List[str]) -> np.ndarray:
+        """Embed chunks in length-sorted batches (less padding per batch), returned in input order"""
+        order = np.argsort([len(c) for c in chunks], kind='stable')
+        embeddings = self._encode([chunks[i] for i in order], batch_size=self.embed_batch_size)
+        return embeddings[np.argsort(order)]
+    
+    @staticmethod
+    def chunk_hash(chunk: str) -> str:
+        """Content hash of a chunk, used as its embedding-store key"""
+        return hashlib.blake2b(chunk.encode(), digest_size=16).hexdigest()
+    
+    @staticmethod
+    def chunk_id(document_key: str, chunk: str) -> str:
+        """Collection ID of a chunk within one document, so each document keeps its own metadata"""
+        return hashlib.blake2b(f"{document_key}\0{chunk}".encode(), digest_size=16).hexdigest()
+    
+    def embed_chunks_cached(self, chunks: List[str], hashes: List[str]) -> np.ndarray:
+        """Embed chunks, reusing stored vectors by content hash and storing new ones"""
+        with self._embedding_store_lock:
+            stored = {}
+            for start in range(0, len(hashes), 500):
+                batch = hashes[start:start + 500]
+                rows = self._embedding_store.execute(
+                    f"SELECT hash, vec FROM embeddings WHERE model = ? AND hash IN ({','.join('?' * len(batch))})",
+                    [self._embedding_store_key, *batch]
+                )
+                stored.update((h, np.frombuffer(vec, dtype=np.float32)) for h, vec in rows)
         
-        while start < len(text):
-            end = start + self.chunk_size
-            chunk = text[start:end]
-            chunks.append(chunk)
-            start += self.chunk_size - self.chunk_overlap
+        # Chunks repeated across documents are embedded once
+        misses = {h: chunk for chunk, h in zip(chunks, hashes) if h not in stored}
+        if misses:
+            fresh = self.embed_chunks(list(misses.values())).astype(np.float32, copy=False)
+            stored.update(zip(misses, fresh))
+            with self._embedding_store_lock:
+                self._embedding_store.executemany(
+                    'INSERT OR REPLACE INTO embeddings (model, hash, vec) VALUES (?, ?, ?)',
+                    [(self._embedding_store_key, h, vec.tobytes()) for h, vec in zip(misses, fresh)]
+                )
+                self._embedding_store_rows += len(misses)
+                if self._embedding_store_rows > self.EMBEDDING_STORE_MAX_ROWS:
+                    self._evict_embeddings()
+                self._embedding_store.commit()
         
-        return chunks
+        return np.vstack([stored[h] for h in hashes])
+    
+    def _evict_embeddings(self):
+        """Drop the oldest stored embeddings down to EMBEDDING_STORE_MAX_ROWS (caller holds the store lock)"""
+        self._embedding_store_rows = self._embedding_store.execute('SELECT COUNT(*) FROM embeddings').fetchone()[0]
+        excess = self._embedding_store_rows - self.EMBEDDING_STORE_MAX_ROWS
+        if excess > 0:
+            self._embedding_store.execute(
+                'DELETE FROM embeddings WHERE rowid IN (SELECT rowid FROM embeddings ORDER BY rowid LIMIT ?)',
+                (excess,)
+            )
+            self._embedding_store_rows -= excess
+    
+    def _load_memory_index(self, collection: str, page_size: int = 1000) -> Dict[str, Any]:
+        """Page a collection out of Chroma into an in-memory index (caller holds _memory_lock)"""
+        index = self._memory_index.get(collection)
+        if index is not None:
+            return index
+        
+        store = self.collections[collection]
+        vectors, ids, documents, metadatas = [], [], [], []
+        offset = 0
+        while True:
+            page = store.get(include=['embeddings', 'documents', 'metadatas'], limit=page_size, offset=offset)
+            if not page['ids']:
+                break
+            vectors.append(np.asarray(page['embeddings'], dtype=np.float32))
+            ids.extend(page['ids'])
+            documents.extend(page['documents'])
+            metadatas.extend(page['metadatas'])
+            offset += len(page['ids'])
+        
+        matrix = np.vstack(vectors) if vectors else np.empty((0, 0), dtype=np.float32)
+        if len(matrix):
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            matrix = matrix / np.maximum(norms, 1e-12)
+        
+        index = {
+            'embeddings': np.ascontiguousarray(matrix, dtype=np.float32),
+            'ids': ids,
+            'id_set': set(ids),
+            'documents': documents,
+            'metadatas': metadatas
+        }
+        self._memory_index[collection] = index
+        return index
+    
+    def _extend_memory_index(self, collection: str, embeddings: np.ndarray, ids: List[str],
+                             documents: List[str], metadatas: List[Dict]):
+        """Append newly added chunks to a collection's in-memory index, if it is loaded"""
+        with self._memory_lock:
+            index = self._memory_index.get(collection)
+            if index is None:
+                return
+            
+            # Chroma ignores adds of existing IDs; mirror that
+            new = [i for i, chunk_id in enumerate(ids) if chunk_id not in index['id_set']]
+            if not new:
+                return
+            
+            rows = embeddings[new].astype(np.float32)
+            index['embeddings'] = np.vstack([index['embeddings'], rows]) if len(index['ids']) else rows
+            for i in new:
+                index['ids'].append(ids[i])
+                index['id_set'].add(ids[i])
+                index['documents'].append(documents[i])
+                index['metadatas'].append(metadatas[i])
+    
+    def _search_memory_index(self, collection: str, query_embedding: np.ndarray, n_results: int) -> List[Dict]:
+        """Cosine top-k over a collection's in-memory index"""
+        with self._memory_lock:
+            index = self._load_memory_index(collection)
+            matrix = index['embeddings']
+            documents = index['documents']
+            metadatas = index['metadatas']
+        
+        if not len(documents) or n_results <= 0:
+            return []
+        
+        scores = matrix @ query_embedding[0].astype(np.float32, copy=False)
+        k = min(n_results, len(scores))
+        top = np.argpartition(scores, -k)[-k:]
+        top = top[np.argsort(scores[top])[::-1]]
+        
+        return [{
+            'content': documents[i],
+            'metadata': metadatas[i] or {},
+            'distance': float(1.0 - scores[i])
+        } for i in top]
     
     async def add_document(self, content: str, metadata: Dict, collection: str = 'docs') -> bool:
         """Add document to vector database"""
+        return await self.add_documents([(content, metadata)], collection)
+    
+    async def add_documents(self, documents: List[Tuple[str, Dict]], collection: str = 'docs') -> bool:
+        """Add several (content, metadata) documents with one embedding pass and one collection write"""
         try:
-            chunks = self.chunk_text(content)
+            # IDs hash the document (content and metadata) with the chunk: re-adding a document is a
+            # no-op, while a chunk shared by two documents is stored under each one's metadata
+            unique = {}
+            for content, metadata in documents:
+                document_key = self.chunk_hash(content) + json_dumps(metadata, sort_keys=True)
+                for chunk in self.chunk_text(content):
+                    unique.setdefault(self.chunk_id(document_key, chunk), (chunk, metadata))
             
-            # Generate embeddings
-            embeddings = self.embedding_model.encode(chunks).tolist()
+            # Chunks already in the collection need neither embedding nor re-adding
+            existing = await self._run_blocking(self.collections[collection].get, ids=list(unique), include=[])
+            for chunk_id in existing['ids']:
+                unique.pop(chunk_id, None)
+            ids = list(unique)
+            chunks = [chunk for chunk, _ in unique.values()]
+            metadatas = [metadata for _, metadata in unique.values()]
+            if not chunks:
+                return True
             
-            # Create unique IDs
-            base_id = hashlib.sha256(content.encode()).hexdigest()[:16]
-            ids = [f"{base_id}_{i}" for i in range(len(chunks))]
+            # Generate embeddings (float32 ndarray, passed to Chroma as-is)
+            embeddings = await self._run_blocking(self.embed_chunks_cached, chunks, [self.chunk_hash(c) for c in chunks])
             
             # Add to collection
-            self.collections[collection].add(
+            await self._run_blocking(
+                self.collections[collection].add,
                 embeddings=embeddings,
                 documents=chunks,
-                metadatas=[metadata] * len(chunks),
+                metadatas=metadatas,
                 ids=ids
             )
+            if self.in_memory:
+                self._extend_memory_index(collection, embeddings, ids, chunks, metadatas)
+            
+            with self._cache_lock:
+                self._collection_versions[collection] = self._collection_versions.get(collection, 0) + 1
             
-            logger.info(f"Added document with {len(chunks)} chunks to {collection}")
+            logger.info(f"Added {len(documents)} document(s) with {len(chunks)} chunks to {collection}")
             return True
         except Exception as e:
             logger.error(f"Error adding document: {e}")
@@ -269,12 +731,32 @@ class RAGSystem:
     
     async def query(self, query_text: str, collection: str = 'docs', n_results: int = 5) -> List[Dict]:
         """Semantic search in vector database"""
+        text_key = hashlib.sha1(query_text.encode()).hexdigest()
+        with self._cache_lock:
+            cache_key = (collection, self._collection_versions.get(collection, 0), text_key, n_results)
+            cached = self._query_cache.get(cache_key)
+            if cached is not None:
+                return copy.deepcopy(cached)
+            query_embedding = self._embedding_cache.get(text_key)
+        
         try:
             # Generate query embedding
-            query_embedding = self.embedding_model.encode([query_text]).tolist()
+            if query_embedding is None:
+                query_embedding = await self._run_blocking(self._encode, [query_text])
+                with self._cache_lock:
+                    self._embedding_cache[text_key] = query_embedding
+            
+            if self.in_memory:
+                formatted = await self._run_blocking(
+                    self._search_memory_index, collection, query_embedding, n_results
+                )
+                with self._cache_lock:
+                    self._query_cache[cache_key] = copy.deepcopy(formatted)
+                return formatted
             
             # Search
-            results = self.collections[collection].query(
+            results = await self._run_blocking(
+                self.collections[collection].query,
                 query_embeddings=query_embedding,
                 n_results=n_results
             )
@@ -289,6 +771,8 @@ class RAGSystem:
                         'distance': results['distances'][0][i] if results['distances'] else None
                     })
             
+            with self._cache_lock:
+                self._query_cache[cache_key] = copy.deepcopy(formatted)
             return formatted
         except Exception as e:
             logger.error(f"Error querying: {e}")
@@ -296,12 +780,21 @@ class RAGSystem:
     
     async def add_learning(self, learning: Learning) -> bool:
         """Add learning to knowledge base"""
+        return await self.add_learnings([learning])
+    
+    async def add_learnings(self, learnings: List[Learning]) -> bool:
+        """Add a batch of learnings to the knowledge base"""
+        return await self.add_documents([self._learning_document(learning) for learning in learnings], 'learnings')
+    
+    @staticmethod
+    def _learning_document(learning: Learning) -> Tuple[str, Dict]:
+        """Searchable text and metadata for a learning"""
         content = f"""
 Task: {learning.task_type}
 Context: {learning.context}
-Strategy: {json.dumps(learning.successful_strategy)}
-Failures: {json.dumps(learning.failure_modes)}
-Prerequisites: {json.dumps(learning.prerequisites)}
+Strategy: {json_dumps(learning.successful_strategy)}
+Failures: {json_dumps(learning.failure_modes)}
+Prerequisites: {json_dumps(learning.prerequisites)}
 """
         
         metadata = {
@@ -310,12 +803,28 @@ Prerequisites: {json.dumps(learning.prerequisites)}
             'timestamp': learning.timestamp.isoformat()
         }
         
-        return await self.add_document(content, metadata, 'learnings')
+        return content, metadata
 
 
 class LearningSystem:
     """Self-improvement and pattern recognition"""
     
+    # Keyword patterns in priority order; code is checked before file so "write some code" is code_generation
+    TASK_PATTERNS = tuple(
+        (task_type, re.compile('|'.join(keywords), re.IGNORECASE))
+        for task_type, keywords in (
+            ('code_generation', ('code', 'script', 'program', 'function')),
+            ('file_operation', ('file', 'read', 'write', 'create')),
+            ('information_retrieval', ('search', 'find', 'look')),
+            ('system_setup', ('install', 'setup', 'configure')),
+            ('analysis', ('analyze', 'check', 'test'))
+        )
+    )
+    
+    RAG_BATCH_SIZE = 32
+    RAG_FLUSH_SECONDS = 1.0
+    PATTERN_SNAPSHOT_SECONDS = 60.0
+    
     def __init__(self, memory_path: str, rag: RAGSystem):
         self.memory_path = Path(memory_path)
         self.memory_path.mkdir(parents=True, exist_ok=True)
@@ -323,58 +832,215 @@ class LearningSystem:
         
         self.learnings_file = self.memory_path / 'learnings.jsonl'
         self.patterns_file = self.memory_path / 'patterns.json'
+        self.patterns_journal = self.memory_path / 'patterns.log'
+        self.learnings_offset_file = self.memory_path / 'learnings.indexed'
         
+        # Pattern updates are appended to a journal as deltas; the full snapshot is
+        # rewritten at most every PATTERN_SNAPSHOT_SECONDS (and on close)
+        self._pattern_seq = 0
+        self._last_snapshot = time.monotonic()
         self.patterns = self._load_patterns()
+        
+        # Learnings are embedded into RAG in batches by a background flusher; the byte
+        # offset of learnings.jsonl indexed so far is persisted, and anything after it
+        # (e.g. queued when the process exited without close) is re-queued on start
+        self._rag_queue: Optional[asyncio.Queue] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._indexed_offset = 0
+        self._index_failed = False
         logger.info("Learning system initialized")
     
     def _load_patterns(self) -> Dict:
-        """Load identified patterns"""
+        """Load identified patterns: snapshot plus journaled deltas newer than it"""
+        patterns = {'task_patterns': {}, 'failure_patterns': {}, 'success_patterns': {}}
         if self.patterns_file.exists():
-            return json.loads(self.patterns_file.read_text())
-        return {'task_patterns': {}, 'failure_patterns': {}, 'success_patterns': {}}
+            snapshot = json_loads(self.patterns_file.read_bytes())
+            if 'seq' in snapshot:
+                patterns, self._pattern_seq = snapshot['patterns'], snapshot['seq']
+            else:  # Pre-journal snapshot: the patterns dict itself
+                patterns = snapshot
+        
+        if self.patterns_journal.exists():
+            journal = self.patterns_journal.read_bytes()
+            for line in journal.split(b'\n'):
+                if not line:
+                    continue
+                try:
+                    delta = json_loads(line)
+                except ValueError:
+                    # Torn write from a crash mid-append
+                    logger.warning("Skipping unreadable patterns journal entry")
+                    continue
+                if delta['seq'] > self._pattern_seq:
+                    self._apply_pattern_delta(patterns, delta)
+                    self._pattern_seq = delta['seq']
+            
+            # Start the next append on its own line after a torn tail
+            if journal and not journal.endswith(b'\n'):
+                with open(self.patterns_journal, 'ab') as f:
+                    f.write(b'\n')
+        return patterns
     
-    def _save_patterns(self):
-        """Save patterns to disk"""
-        self.patterns_file.write_text(json.dumps(self.patterns, indent=2))
+    @staticmethod
+    def _apply_pattern_delta(patterns: Dict, delta: Dict):
+        """Apply one journaled learning to the pattern tables"""
+        patterns['success_patterns'].setdefault(delta['task_type'], []).append(delta['success'])
+        for failure in delta['failures']:
+            patterns['failure_patterns'][failure] = patterns['failure_patterns'].get(failure, 0) + 1
+    
+    def _save_patterns(self, delta: Dict):
+        """Journal a pattern delta, snapshotting the full table when the interval has passed"""
+        with open(self.patterns_journal, 'ab') as f:
+            f.write(json_dumps_bytes(delta) + b'\n')
+        if time.monotonic() - self._last_snapshot >= self.PATTERN_SNAPSHOT_SECONDS:
+            self._snapshot_patterns()
+    
+    def _snapshot_patterns(self):
+        """Atomically rewrite the pattern snapshot and truncate the journal it covers"""
+        tmp = self.patterns_file.with_suffix('.json.tmp')
+        tmp.write_bytes(json_dumps_bytes({'seq': self._pattern_seq, 'patterns': self.patterns}, indent=True))
+        os.replace(tmp, self.patterns_file)
+        self.patterns_journal.write_bytes(b'')
+        self._last_snapshot = time.monotonic()
     
     async def store_learning(self, learning: Learning):
         """Store a learning experience"""
+        # Start the flusher before appending so the backlog it reads excludes this learning
+        self._start_flusher()
+        
         # Append to JSONL
-        with open(self.learnings_file, 'a') as f:
-            f.write(json.dumps(learning.to_dict()) + '\n')
+        with open(self.learnings_file, 'ab') as f:
+            f.write(json_dumps_bytes(learning.to_dict()) + b'\n')
+            end_offset = f.tell()
         
-        # Add to RAG
-        await self.rag.add_learning(learning)
+        # Queue for batched RAG indexing
+        await self._rag_queue.put((learning, end_offset))
         
         # Update patterns
         self._update_patterns(learning)
         
         logger.info(f"Stored learning for task type: {learning.task_type}")
     
-    def _update_patterns(self, learning: Learning):
-        """Update pattern recognition"""
-        task_type = learning.task_type
+    def _start_flusher(self):
+        """Run the flusher on the current loop, queueing learnings not yet indexed"""
+        loop = asyncio.get_running_loop()
+        if self._flush_task is not None and not self._flush_task.done() and self._flush_task.get_loop() is loop:
+            return
         
-        # Track successful patterns
-        if task_type not in self.patterns['success_patterns']:
-            self.patterns['success_patterns'][task_type] = []
-        
-        self.patterns['success_patterns'][task_type].append({
-            'strategy': learning.successful_strategy,
-            'confidence': learning.confidence_score,
-            'timestamp': learning.timestamp.isoformat()
-        })
+        # A queue bound to a previous loop is dropped; its learnings are re-read from disk
+        self._rag_queue = asyncio.Queue()
+        self._index_failed = False
+        for item in self._load_unindexed_learnings():
+            self._rag_queue.put_nowait(item)
+        self._flush_task = loop.create_task(self._flush_loop())
+    
+    def _load_unindexed_learnings(self) -> List[Tuple[Learning, int]]:
+        """Learnings after the persisted indexed offset, with the file offset each one ends at"""
+        if self.learnings_offset_file.exists():
+            self._indexed_offset = int(self.learnings_offset_file.read_text() or 0)
+        if not self.learnings_file.exists():
+            return []
         
-        # Track failure patterns
-        for failure in learning.failure_modes:
-            if failure not in self.patterns['failure_patterns']:
-                self.patterns['failure_patterns'][failure] = 0
-            self.patterns['failure_patterns'][failure] += 1
+        with open(self.learnings_file, 'rb') as f:
+            f.seek(self._indexed_offset)
+            data = f.read()
+        if data and not data.endswith(b'\n'):
+            # Torn tail from an interrupted append; terminate it so the next line stays parseable
+            with open(self.learnings_file, 'ab') as f:
+                f.write(b'\n')
+            data += b'\n'
         
-        self._save_patterns()
+        pending = []
+        offset = self._indexed_offset
+        for line in data.split(b'\n')[:-1]:
+            offset += len(line) + 1
+            if not line:
+                continue
+            try:
+                pending.append((Learning.from_dict(json_loads(line)), offset))
+            except (ValueError, KeyError, TypeError):
+                logger.warning("Skipping unreadable learnings entry")
+        if pending:
+            logger.info(f"Re-queueing {len(pending)} learning(s) not yet indexed")
+        return pending
+    
+    def _save_indexed_offset(self, offset: int):
+        """Persist how much of learnings.jsonl is indexed"""
+        self._indexed_offset = offset
+        tmp = self.learnings_offset_file.with_suffix('.tmp')
+        tmp.write_text(str(offset))
+        os.replace(tmp, self.learnings_offset_file)
+    
+    async def _flush_loop(self):
+        """Index queued learnings in batches of up to RAG_BATCH_SIZE, waiting at most RAG_FLUSH_SECONDS"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._rag_queue.get()]
+            deadline = loop.time() + self.RAG_FLUSH_SECONDS
+            # A None entry (queued by flush) closes the current batch early
+            while batch[-1] is not None and len(batch) < self.RAG_BATCH_SIZE:
+                if self._rag_queue.empty():
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._rag_queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    batch.append(self._rag_queue.get_nowait())
+            
+            try:
+                items = [item for item in batch if item is not None]
+                if items:
+                    indexed = await self.rag.add_learnings([learning for learning, _ in items])
+                    # After a failure the offset stays put, so the rest is retried on the next start
+                    self._index_failed = self._index_failed or not indexed
+                    if not self._index_failed:
+                        self._save_indexed_offset(items[-1][1])
+            finally:
+                for _ in batch:
+                    self._rag_queue.task_done()
+    
+    async def flush(self):
+        """Wait until every queued learning is indexed"""
+        self._start_flusher()
+        await self._rag_queue.put(None)
+        await self._rag_queue.join()
+    
+    async def close(self):
+        """Flush queued learnings, snapshot patterns and stop the background flusher"""
+        await self.flush()
+        self._snapshot_patterns()
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+    
+    def _update_patterns(self, learning: Learning):
+        """Update pattern recognition"""
+        self._pattern_seq += 1
+        delta = {
+            'seq': self._pattern_seq,
+            'task_type': learning.task_type,
+            # Track successful patterns
+            'success': {
+                'strategy': learning.successful_strategy,
+                'confidence': learning.confidence_score,
+                'timestamp': learning.timestamp.isoformat()
+            },
+            # Track failure patterns
+            'failures': learning.failure_modes
+        }
+        self._apply_pattern_delta(self.patterns, delta)
+        self._save_patterns(delta)
     
     async def get_relevant_learnings(self, query: str, n_results: int = 3) -> List[Dict]:
         """Retrieve relevant past learnings"""
+        await self.flush()
         return await self.rag.query(query, collection='learnings', n_results=n_results)
     
     async def reflect_on_task(self, query: str, history: List[Dict], final_result: str, execution_time: float) -> Learning:
@@ -416,20 +1082,10 @@ class LearningSystem:
     
     def _classify_task(self, query: str) -> str:
         """Classify task type from query"""
-        query_lower = query.lower()
-        
-        if any(kw in query_lower for kw in ['file', 'read', 'write', 'create']):
-            return 'file_operation'
-        elif any(kw in query_lower for kw in ['search', 'find', 'look']):
-            return 'information_retrieval'
-        elif any(kw in query_lower for kw in ['code', 'script', 'program', 'function']):
-            return 'code_generation'
-        elif any(kw in query_lower for kw in ['install', 'setup', 'configure']):
-            return 'system_setup'
-        elif any(kw in query_lower for kw in ['analyze', 'check', 'test']):
-            return 'analysis'
-        else:
-            return 'general_task'
+        for task_type, pattern in self.TASK_PATTERNS:
+            if pattern.search(query):
+                return task_type
+        return 'general_task'
     
     def _extract_prerequisites(self, history: List[Dict]) -> List[str]:
         """Extract prerequisites from execution history"""
@@ -529,7 +1185,7 @@ Be efficient, security-conscious, and learn from failures."""
                     params.get('collection', 'docs'),
                     params.get('n_results', 5)
                 )
-                return True, json.dumps(results, indent=2)
+                return True, json_dumps(results, indent=True)
             
             elif action_type == 'install_dependency':
                 package = params.get('package', '')
@@ -545,14 +1201,8 @@ Be efficient, security-conscious, and learn from failures."""
             logger.error(f"Action execution error: {e}")
             return False, str(e)
     
-    async def think_and_act(self, query: str, context: str, history: List[Dict]) -> Dict:
+    async def think_and_act(self, query: str, context: str, history_text: str) -> Dict:
         """Generate thought and action using LLM"""
-        # Format history for context
-        history_text = "\n".join([
-            f"Step {i+1}:\nThought: {h['thought']}\nAction: {h['action']}\nObservation: {h['observation'][:200]}"
-            for i, h in enumerate(history[-5:])  # Last 5 steps
-        ])
-        
         user_message = f"""Task: {query}
 
 Relevant Knowledge:
@@ -580,7 +1230,7 @@ What should you do next?"""
             elif '```' in content:
                 content = content.split('```')[1].split('```')[0].strip()
             
-            decision = json.loads(content)
+            decision = json_loads(content)
             return decision
         
         except json.JSONDecodeError as e:
@@ -615,13 +1265,15 @@ What should you do next?"""
             context += f"- {learning['content'][:200]}...\n"
         
         history = []
+        # Last 5 steps, each rendered once when recorded
+        history_tail = deque(maxlen=5)
         iteration = 0
         
         logger.info(f"Starting ReAct loop for query: {query}")
         
         while iteration < self.max_iterations:
             # THINK & ACT
-            decision = await self.think_and_act(query, context, history)
+            decision = await self.think_and_act(query, context, "\n".join(history_tail))
             
             thought = decision.get('thought', '')
             action_dict = decision.get('action', {})
@@ -669,6 +1321,9 @@ What should you do next?"""
                 'success': success,
                 'confidence': confidence
             })
+            history_tail.append(
+                f"Step {iteration+1}:\nThought: {thought}\nAction: {action}\nObservation: {observation[:200]}"
+            )
             
             # Update context with observation
             if success and len(observation) < 1000:
@@ -702,14 +1357,22 @@ class AutonomousOrchestrator:
         # Initialize components
         self.executor = SecureExecutor(
             workspace_path=config['WORKSPACE_PATH'],
-            safe_mode=config.get('SAFE_MODE', False)
+            safe_mode=config.get('SAFE_MODE', False),
+            audit_path=config.get('AUDIT_LOG_PATH'),
+            audit_max=config.get('AUDIT_MAX', 10000)
         )
         
         self.rag = RAGSystem(
             db_path=config['VECTOR_DB_PATH'],
             embedding_model=config['EMBEDDING_MODEL'],
             chunk_size=config.get('CHUNK_SIZE', 512),
-            chunk_overlap=config.get('CHUNK_OVERLAP', 50)
+            chunk_overlap=config.get('CHUNK_OVERLAP', 50),
+            embed_batch_size=config.get('EMBED_BATCH_SIZE', 64),
+            backend=config.get('EMBEDDING_BACKEND', 'torch'),
+            hnsw_m=config.get('HNSW_M', 24),
+            hnsw_ef_construction=config.get('HNSW_EF_CONSTRUCTION', 128),
+            hnsw_ef_search=config.get('HNSW_EF_SEARCH', 100),
+            in_memory=config.get('RAG_INMEMORY', False)
         )
         
         self.learning = LearningSystem(
@@ -739,6 +1402,11 @@ class AutonomousOrchestrator:
         """Query learned patterns and experiences"""
         return await self.learning.get_relevant_learnings(query)
     
+    async def close(self):
+        """Flush pending learnings and stop background work"""
+        await self.learning.close()
+        await self.executor.close()
+    
     def get_status(self) -> Dict:
         """Get system status"""
         return {
@@ -778,8 +1446,16 @@ def load_config() -> Dict:
         'WORKSPACE_PATH': os.getenv('WORKSPACE_PATH', './workspace'),
         'MAX_ITERATIONS': int(os.getenv('MAX_ITERATIONS', '10')),
         'SAFE_MODE': os.getenv('SAFE_MODE', 'false').lower() == 'true',
+        'AUDIT_LOG_PATH': os.getenv('AUDIT_LOG_PATH', './data/audit.ndjson'),
+        'AUDIT_MAX': int(os.getenv('AUDIT_MAX', '10000')),
         'CHUNK_SIZE': int(os.getenv('CHUNK_SIZE', '512')),
         'CHUNK_OVERLAP': int(os.getenv('CHUNK_OVERLAP', '50')),
+        'EMBED_BATCH_SIZE': int(os.getenv('EMBED_BATCH_SIZE', '64')),
+        'EMBEDDING_BACKEND': os.getenv('EMBEDDING_BACKEND', 'torch'),
+        'HNSW_M': int(os.getenv('HNSW_M', '24')),
+        'HNSW_EF_CONSTRUCTION': int(os.getenv('HNSW_EF_CONSTRUCTION', '128')),
+        'HNSW_EF_SEARCH': int(os.getenv('HNSW_EF_SEARCH', '100')),
+        'RAG_INMEMORY': os.getenv('RAG_INMEMORY', 'false').lower() == 'true',
     }
     
     return config
@@ -793,5 +1469,6 @@ if __name__ == '__main__':
         
         result = await orchestrator.execute_task("Create a Python script that lists all files in the workspace")
         print(json.dumps(result, indent=2, default=str))
+        await orchestrator.close()
     
     asyncio.run(test())
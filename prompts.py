@@ -34,8 +34,9 @@ You can execute the following action types:
 - **web_scrape**: Extract webpage content
   Parameters: {"url": "https://example.com"}
 
-- **git_operation**: Git operations (clone, pull, push, commit)
+- **git_operation**: Git operations (clone, pull, push, commit, cat-file, rev-parse)
   Parameters: {"operation": "clone", "repo_url": "...", "message": "..."}
+  For cat-file (object contents, trees listed) / rev-parse (object hash): {"operation": "cat-file", "object": "HEAD:README.md"}
 
 - **api_call**: Make HTTP API calls
   Parameters: {"method": "GET", "url": "...", "headers": {...}, "data": {...}}
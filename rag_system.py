@@ -8,7 +8,7 @@ from datetime import datetime
 import chromadb
 from chromadb.config import Settings
 from sentence_transformers import SentenceTransformer
-from config import config
+from config import config, ensure_dir
 
 logger = logging.getLogger(__name__)
 
@@ -18,7 +18,7 @@ class RAGSystem:
         
         # Initialize ChromaDB
         self.client = chromadb.PersistentClient(
-            path=config.rag.vector_db_path,
+            path=ensure_dir(config.rag.vector_db_path),
             settings=Settings(anonymized_telemetry=False)
         )
         
@@ -121,37 +121,46 @@ class RAGSystem:
         
         return total_chunks
     
-    def search(self, query: str, n_results: Optional[int] = None, filter_metadata: Optional[Dict] = None) -> List[Dict[str, Any]]:
+    def _format_results(self, results: Dict[str, Any], index: int) -> List[Dict[str, Any]]:
+        """Format the index-th query of a Chroma result set, applying the similarity threshold"""
+        formatted_results = []
+        if results['documents'] and results['documents'][index]:
+            for i, doc in enumerate(results['documents'][index]):
+                distance = results['distances'][index][i]
+                similarity = 1 - distance  # Convert distance to similarity
+                
+                if similarity >= config.rag.similarity_threshold:
+                    formatted_results.append({
+                        "text": doc,
+                        "metadata": results['metadatas'][index][i],
+                        "similarity": similarity,
+                        "id": results['ids'][index][i]
+                    })
+        return formatted_results
+    
+    def search_batch(self, queries: List[str], n_results: Optional[int] = None, filter_metadata: Optional[Dict] = None) -> List[List[Dict[str, Any]]]:
         """
-        Semantic search in vector database
-        Returns list of relevant chunks with metadata
+        Semantic search for several queries at once
+        Embeds all queries in one forward pass and issues a single collection query
         """
         n_results = n_results or config.rag.max_results
         
-        # Generate query embedding
-        query_embedding = self.embedding_model.encode(query, show_progress_bar=False).tolist()
+        query_embeddings = self.embedding_model.encode(queries, show_progress_bar=False).tolist()
         
-        # Search
         results = self.collection.query(
-            query_embeddings=[query_embedding],
+            query_embeddings=query_embeddings,
             n_results=n_results,
             where=filter_metadata
         )
         
-        # Format results
-        formatted_results = []
-        if results['documents'] and results['documents'][0]:
-            for i, doc in enumerate(results['documents'][0]):
-                distance = results['distances'][0][i]
-                similarity = 1 - distance  # Convert distance to similarity
-                
-                if similarity >= config.rag.similarity_threshold:
-                    formatted_results.append({
-                        "text": doc,
-                        "metadata": results['metadatas'][0][i],
-                        "similarity": similarity,
-                        "id": results['ids'][0][i]
-                    })
+        return [self._format_results(results, i) for i in range(len(queries))]
+    
+    def search(self, query: str, n_results: Optional[int] = None, filter_metadata: Optional[Dict] = None) -> List[Dict[str, Any]]:
+        """
+        Semantic search in vector database
+        Returns list of relevant chunks with metadata
+        """
+        formatted_results = self.search_batch([query], n_results, filter_metadata)[0]
         
         logger.debug(f"Search for '{query}' returned {len(formatted_results)} results")
         return formatted_results
@@ -3,7 +3,7 @@
 import os
 import asyncio
 import time
-from typing import Dict, Any
+from typing import Dict, Any, Callable, Optional
 from openai import OpenAI, APIError
 
 # Import the global config object from the separate config file
@@ -34,9 +34,10 @@ class ReactEngine:
             "and execute actions. Provide concise, factual responses based on the task outcome."
         )
 
-    async def execute_task(self, prompt: str) -> Dict[str, Any]:
+    async def execute_task(self, prompt: str, progress: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
         """
         Executes a task by calling the configured OpenAI model.
+        progress, if given, is called on the event loop with short status updates.
         """
         start_time = time.time()
         
@@ -46,6 +47,9 @@ class ReactEngine:
                 {"role": "user", "content": prompt}
             ]
 
+            if progress:
+                progress(f"Waiting for {self.model}...")
+
             # CRITICAL FIX: Run synchronous client call in a thread pool
             completion = await asyncio.to_thread(
                 self.client.chat.completions.create,
@@ -99,7 +103,7 @@ except ValueError as e:
 import os
 import asyncio
 import time
-from typing import Dict, Any
+from typing import Dict, Any, Callable, Optional
 from openai import OpenAI, APIError
 
 # Import the global config object from the separate config file
@@ -130,9 +134,10 @@ class ReactEngine:
             "and execute actions. Provide concise, factual responses based on the task outcome."
         )
 
-    async def execute_task(self, prompt: str) -> Dict[str, Any]:
+    async def execute_task(self, prompt: str, progress: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
         """
         Executes a task by calling the configured OpenAI model.
+        progress, if given, is called on the event loop with short status updates.
         """
         start_time = time.time()
         
@@ -142,6 +147,9 @@ class ReactEngine:
                 {"role": "user", "content": prompt}
             ]
 
+            if progress:
+                progress(f"Waiting for {self.model}...")
+
             # CRITICAL FIX: Run synchronous client call in a thread pool
             completion = await asyncio.to_thread(
                 self.client.chat.completions.create,
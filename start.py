@@ -69,6 +69,8 @@ def print_capabilities(orchestrator):
         print("\n🌟 ADVANCED CAPABILITIES")
         print("  ✓ web_search - Search the internet")
         print("  ✓ web_scrape - Extract webpage content")
+        print("  ✓ batch_search - Run many searches concurrently")
+        print("  ✓ batch_scrape - Extract content from many pages concurrently")
         print("  ✓ git_clone - Clone repositories")
         print("  ✓ git_commit - Commit changes")
         print("  ✓ parse_json - Parse JSON data")
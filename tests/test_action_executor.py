@@ -0,0 +1,111 @@
+"""
+Tests for ActionExecutor's persistent Python worker and git cat-file lookups
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# config validates these at import
+os.environ.setdefault('TELEGRAM_BOT_TOKEN', 'test_token')
+os.environ.setdefault('TELEGRAM_ADMIN_ID', '12345')
+os.environ.setdefault('LLM_PROVIDER', 'local')
+
+from action_executor import ActionExecutor, PY_WORKER_SUPPORTED
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    """Executor with its workspace in a temporary directory"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        import config
+        monkeypatch.setattr(config.config.execution, 'workspace_path', tmpdir)
+        monkeypatch.setattr(config.config.execution, 'timeout', 30)
+        executor = ActionExecutor()
+        yield executor
+        executor.close()
+
+
+@pytest.mark.skipif(not PY_WORKER_SUPPORTED, reason="persistent worker is POSIX-only")
+class TestPythonWorker:
+    """Round trips through the persistent Python worker"""
+
+    def test_round_trip(self, executor):
+        result = executor.execute({'action_type': 'python_execute', 'parameters': {'code': 'print("hello")'}})
+
+        assert result['success'] is True
+        assert result['output'] == 'hello\n'
+
+    def test_child_process_output_is_captured(self, executor):
+        result = executor.execute({'action_type': 'python_execute', 'parameters': {'code': 'import os; os.system("echo hi")'}})
+
+        assert result['success'] is True
+        assert result['output'] == 'hi\n'
+
+    def test_cwd_is_restored_between_runs(self, executor):
+        executor.execute({'action_type': 'python_execute', 'parameters': {'code': 'import os; os.chdir("/")'}})
+        result = executor.execute({'action_type': 'python_execute', 'parameters': {'code': 'import os; print(os.getcwd())'}})
+
+        assert os.path.realpath(result['output'].strip()) == os.path.realpath(executor.workspace)
+
+    def test_failure_reports_traceback(self, executor):
+        result = executor.execute({'action_type': 'python_execute', 'parameters': {'code': 'raise ValueError("boom")'}})
+
+        assert result['success'] is False
+        assert 'ValueError: boom' in result['output']
+
+    def test_environ_and_path_are_restored_between_runs(self, executor):
+        executor.execute({'action_type': 'python_execute', 'parameters': {'code': 'import os, sys; os.environ["LEAK"] = "1"; sys.path.append("/leak")'}})
+        result = executor.execute({'action_type': 'python_execute', 'parameters': {'code': 'import os, sys; print(os.environ.get("LEAK"), "/leak" in sys.path)'}})
+
+        assert result['output'] == 'None False\n'
+
+    def test_leftover_threads_do_not_write_into_later_runs(self, executor):
+        code = 'import threading, time\nthreading.Thread(target=lambda: (time.sleep(0.3), print("ghost")), daemon=True).start()'
+        executor.execute({'action_type': 'python_execute', 'parameters': {'code': code}})
+        result = executor.execute({'action_type': 'python_execute', 'parameters': {'code': 'import time; time.sleep(0.6); print("clean")'}})
+
+        assert result['output'] == 'clean\n'
+
+
+class TestGitCatFile:
+    """Lookups through the shared git cat-file process"""
+
+    @pytest.fixture
+    def repo(self, executor):
+        workspace = str(executor.workspace)
+        for args in (["init", "-q"], ["config", "user.email", "a@b"], ["config", "user.name", "a"]):
+            subprocess.run(["git", *args], cwd=workspace, check=True)
+        (executor.workspace / "a.txt").write_text("hello\n")
+        subprocess.run(["git", "add", "."], cwd=workspace, check=True)
+        subprocess.run(["git", "commit", "-qm", "init"], cwd=workspace, check=True)
+        return workspace
+
+    def git(self, executor, operation, obj):
+        return executor.execute({'action_type': 'git_operation', 'parameters': {'operation': operation, 'object': obj}})
+
+    def test_invalid_names_are_rejected_without_desync(self, executor, repo):
+        head = subprocess.run(["git", "rev-parse", "HEAD"], cwd=repo, capture_output=True, text=True).stdout.strip()
+
+        for name in ("HEAD\nHEAD:a.txt", "HEAD HEAD", ""):
+            assert self.git(executor, 'rev-parse', name)['success'] is False
+        assert self.git(executor, 'rev-parse', 'HEAD')['output'] == head
+        assert self.git(executor, 'cat-file', 'HEAD:a.txt')['output'] == 'hello\n'
+
+    def test_missing_object(self, executor, repo):
+        result = self.git(executor, 'cat-file', 'HEAD:nope.txt')
+
+        assert result['success'] is False
+        assert 'missing' in result['output']
+        assert self.git(executor, 'cat-file', 'HEAD:a.txt')['output'] == 'hello\n'
+
+    def test_tree_is_listed_like_cat_file_p(self, executor, repo):
+        expected = subprocess.run(["git", "cat-file", "-p", "HEAD^{tree}"], cwd=repo, capture_output=True, text=True).stdout
+
+        assert self.git(executor, 'cat-file', 'HEAD^{tree}')['output'] == expected
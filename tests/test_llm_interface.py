@@ -0,0 +1,53 @@
+"""
+Tests for JSON extraction from LLM responses
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# config validates these at import
+os.environ.setdefault('TELEGRAM_BOT_TOKEN', 'test_token')
+os.environ.setdefault('TELEGRAM_ADMIN_ID', '12345')
+os.environ.setdefault('LLM_PROVIDER', 'local')
+
+from llm_interface import _extract_json, _parse_json_response
+
+
+class TestParseJsonResponse:
+    """The first JSON value in a response is found and parsed"""
+
+    def test_fenced_json(self):
+        text = 'Here is the plan:\n```json\n{"action": "search", "steps": [1, 2]}\n```\nDone.'
+
+        assert _parse_json_response(text) == {"action": "search", "steps": [1, 2]}
+
+    def test_unfenced_json_after_prose(self):
+        text = 'Sure, the result is {"ok": true} as requested.'
+
+        assert _parse_json_response(text) == {"ok": True}
+
+    def test_brackets_inside_strings(self):
+        text = '{"code": "if x: y = {1: [2]}", "note": "}]"}'
+
+        assert _extract_json(text) == (0, len(text))
+        assert _parse_json_response(text) == {"code": "if x: y = {1: [2]}", "note": "}]"}
+
+    def test_escaped_quotes(self):
+        text = 'Result: {"quote": "she said \\"{hi}\\"", "n": 1} trailing'
+
+        assert _parse_json_response(text) == {"quote": 'she said "{hi}"', "n": 1}
+
+    def test_leading_bracketed_note_is_skipped(self):
+        text = '[note] the answer follows: {"answer": 42}'
+
+        assert _parse_json_response(text) == {"answer": 42}
+
+    def test_no_json_raises(self):
+        with pytest.raises(json.JSONDecodeError):
+            _parse_json_response('No structured output here.')
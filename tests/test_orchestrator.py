@@ -7,6 +7,7 @@ import pytest
 import asyncio
 import json
 import tempfile
+import numpy as np
 from pathlib import Path
 from datetime import datetime
 from unittest.mock import Mock, AsyncMock, patch, MagicMock
@@ -162,6 +163,29 @@ class TestSecureExecutor:
         assert success is True
         assert 'Hello from Python' in output
     
+    @pytest.mark.asyncio
+    async def test_python_worker_round_trip(self, temp_workspace):
+        executor = SecureExecutor(str(temp_workspace), safe_mode=False)
+        
+        try:
+            # Delimiter-like bytes and child-process output do not disturb the framing
+            success, output = await executor.execute_python('import os; print("a\\x1eb"); os.system("echo child")')
+            assert success is True
+            assert output == 'a\x1eb\nchild\n'
+        
+            # cwd changes do not leak into the next snippet
+            await executor.execute_python('import os; os.chdir("/")')
+            success, output = await executor.execute_python('import os; print(os.getcwd())')
+            assert output.strip() == str(temp_workspace)
+        
+            # A worker that dies is replaced on the next call
+            success, output = await executor.execute_python('import os; os._exit(1)')
+            assert success is False
+            success, output = await executor.execute_python('print("again")')
+            assert (success, output) == (True, 'again\n')
+        finally:
+            await executor.close()
+    
     @pytest.mark.asyncio
     async def test_file_read(self, temp_workspace):
         executor = SecureExecutor(str(temp_workspace), safe_mode=False)
@@ -175,6 +199,19 @@ class TestSecureExecutor:
         assert success is True
         assert content == 'test content'
     
+    @pytest.mark.asyncio
+    async def test_file_read_marks_truncation(self, temp_workspace):
+        executor = SecureExecutor(str(temp_workspace), safe_mode=False)
+        executor.MAX_READ_BYTES = 8
+        
+        test_file = temp_workspace / 'long.txt'
+        test_file.write_text('0123456789')
+        
+        success, content = await executor.read_file(str(test_file))
+        
+        assert success is True
+        assert content == '01234567\n... (truncated)'
+    
     @pytest.mark.asyncio
     async def test_file_write(self, temp_workspace):
         executor = SecureExecutor(str(temp_workspace), safe_mode=False)
@@ -188,6 +225,16 @@ class TestSecureExecutor:
         assert success is True
         assert test_file.read_text() == 'new content'
     
+    @pytest.mark.asyncio
+    async def test_file_write_reports_bytes(self, temp_workspace):
+        executor = SecureExecutor(str(temp_workspace), safe_mode=False)
+        
+        test_file = temp_workspace / 'utf8.txt'
+        success, message = await executor.write_file(str(test_file), 'café')
+        
+        assert success is True
+        assert message == f"Wrote 5 bytes to {test_file}"
+    
     @pytest.mark.asyncio
     async def test_path_validation(self, temp_workspace):
         executor = SecureExecutor(str(temp_workspace), safe_mode=False)
@@ -261,6 +308,71 @@ class TestRAGSystem:
         assert len(results) > 0
         assert 'Python' in results[0]['content']
     
+    @pytest.mark.asyncio
+    async def test_shared_chunk_keeps_each_documents_metadata(self, test_config):
+        rag = RAGSystem(
+            db_path=test_config['VECTOR_DB_PATH'],
+            embedding_model=test_config['EMBEDDING_MODEL']
+        )
+        
+        for source in ('first', 'second'):
+            await rag.add_document(content='Shared boilerplate paragraph', metadata={'source': source}, collection='docs')
+        await rag.add_document(content='Shared boilerplate paragraph', metadata={'source': 'first'}, collection='docs')
+        
+        stored = rag.collections['docs'].get(include=['metadatas'])
+        assert sorted(m['source'] for m in stored['metadatas']) == ['first', 'second']
+    
+    def test_l2_collections_are_rebuilt_as_cosine(self, test_config):
+        import chromadb
+        from chromadb.config import Settings
+        
+        client = chromadb.PersistentClient(path=test_config['VECTOR_DB_PATH'], settings=Settings(anonymized_telemetry=False))
+        client.create_collection('docs').add(
+            ids=['a', 'b'], embeddings=[[1.0, 0.0], [0.0, 1.0]], documents=['x', 'y'], metadatas=[{'k': 1}, {'k': 2}]
+        )
+        
+        rag = RAGSystem(
+            db_path=test_config['VECTOR_DB_PATH'],
+            embedding_model=test_config['EMBEDDING_MODEL']
+        )
+        
+        docs = rag.collections['docs']
+        assert docs.metadata['hnsw:space'] == 'cosine'
+        assert sorted(docs.get()['documents']) == ['x', 'y']
+    
+    def test_embedding_store_round_trips_float32(self, test_config):
+        rag = RAGSystem(
+            db_path=test_config['VECTOR_DB_PATH'],
+            embedding_model=test_config['EMBEDDING_MODEL']
+        )
+        chunks = ['alpha chunk', 'beta chunk']
+        hashes = [rag.chunk_hash(chunk) for chunk in chunks]
+        
+        fresh = rag.embed_chunks_cached(chunks, hashes)
+        cached = rag.embed_chunks_cached(chunks, hashes)
+        
+        assert cached.dtype == np.float32
+        assert np.array_equal(fresh, cached)
+    
+    @pytest.mark.asyncio
+    async def test_query_cache_invalidated_on_add(self, test_config):
+        rag = RAGSystem(
+            db_path=test_config['VECTOR_DB_PATH'],
+            embedding_model=test_config['EMBEDDING_MODEL']
+        )
+        
+        await rag.add_document('Python is a programming language', {'source': 'test'}, 'docs')
+        first = await rag.query('programming language', collection='docs', n_results=5)
+        first[0]['content'] = 'mutated'
+        
+        # Cached results are copies
+        again = await rag.query('programming language', collection='docs', n_results=5)
+        assert 'Python' in again[0]['content']
+        
+        await rag.add_document('Rust is a systems programming language', {'source': 'test'}, 'docs')
+        after_add = await rag.query('programming language', collection='docs', n_results=5)
+        assert len(after_add) == 2
+    
     def test_chunk_text(self, test_config):
         rag = RAGSystem(
             db_path=test_config['VECTOR_DB_PATH'],
@@ -359,6 +471,82 @@ class TestLearningSystem:
         
         assert len(results) > 0
     
+    @pytest.mark.asyncio
+    async def test_patterns_replay_snapshot_journal_and_torn_tail(self, test_config):
+        rag = RAGSystem(
+            db_path=test_config['VECTOR_DB_PATH'],
+            embedding_model=test_config['EMBEDDING_MODEL']
+        )
+        memory_path = Path(test_config['MEMORY_PATH'])
+        
+        def make_learning(task_type, failures):
+            return Learning(
+                task_type=task_type,
+                context='test context',
+                successful_strategy=[],
+                failure_modes=failures,
+                execution_time=1.0,
+                confidence_score=0.8,
+                timestamp=datetime.now(),
+                prerequisites=[]
+            )
+        
+        learning_system = LearningSystem(memory_path=str(memory_path), rag=rag)
+        await learning_system.store_learning(make_learning('file_operation', ['timeout']))
+        await learning_system.close()  # Snapshot covers the first learning
+        
+        learning_system = LearningSystem(memory_path=str(memory_path), rag=rag)
+        await learning_system.store_learning(make_learning('analysis', ['timeout', 'denied']))
+        await learning_system.flush()
+        
+        # Crash mid-append leaves a partial last line
+        with open(memory_path / 'patterns.log', 'ab') as f:
+            f.write(b'{"seq": 3, "task_ty')
+        
+        restored = LearningSystem(memory_path=str(memory_path), rag=rag)
+        
+        assert restored.patterns['failure_patterns'] == {'timeout': 2, 'denied': 1}
+        assert set(restored.patterns['success_patterns']) == {'file_operation', 'analysis'}
+        
+        # Appends after the torn tail are readable again
+        await restored.store_learning(make_learning('analysis', ['denied']))
+        await restored.flush()
+        reloaded = LearningSystem(memory_path=str(memory_path), rag=rag)
+        assert reloaded.patterns['failure_patterns'] == {'timeout': 2, 'denied': 2}
+        
+        await restored.close()
+    
+    @pytest.mark.asyncio
+    async def test_unindexed_learnings_are_requeued_on_start(self, test_config):
+        rag = RAGSystem(
+            db_path=test_config['VECTOR_DB_PATH'],
+            embedding_model=test_config['EMBEDDING_MODEL']
+        )
+        
+        learning_system = LearningSystem(memory_path=test_config['MEMORY_PATH'], rag=rag)
+        await learning_system.store_learning(Learning(
+            task_type='file_operation',
+            context='learning queued when the process exited',
+            successful_strategy=[],
+            failure_modes=[],
+            execution_time=1.0,
+            confidence_score=0.8,
+            timestamp=datetime.now(),
+            prerequisites=[]
+        ))
+        # Exit before the flusher indexed the queued learning
+        learning_system._flush_task.cancel()
+        assert rag.collections['learnings'].count() == 0
+        
+        restarted = LearningSystem(memory_path=test_config['MEMORY_PATH'], rag=rag)
+        await restarted.flush()
+        
+        assert rag.collections['learnings'].count() > 0
+        assert (Path(test_config['MEMORY_PATH']) / 'learnings.indexed').read_text() == str(
+            (Path(test_config['MEMORY_PATH']) / 'learnings.jsonl').stat().st_size
+        )
+        await restarted.close()
+    
     def test_classify_task(self, test_config):
         rag = RAGSystem(
             db_path=test_config['VECTOR_DB_PATH'],
@@ -3,9 +3,14 @@ import os
 import json
 import hashlib
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Union
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib codec
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 def hash_string(text: str) -> str:
@@ -32,3 +37,25 @@ def safe_json_loads(text: str, default: Any = None) -> Any:
 def count_tokens(text: str) -> int:
     """Rough token count (1 token ≈ 4 chars)"""
     return len(text) // 4
+
+def json_dumps_bytes(obj: Any, indent: bool = False, sort_keys: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON bytes (orjson when installed)"""
+    if orjson is not None:
+        # OPT_NON_STR_KEYS matches the stdlib's handling of int/None keys
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0) | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return orjson.dumps(obj, option=option)
+    # Same compact, non-ASCII-preserving layout orjson produces, so output (and hashes of it) match
+    separators = None if indent else (",", ":")
+    return json.dumps(
+        obj, indent=2 if indent else None, sort_keys=sort_keys, separators=separators, ensure_ascii=False
+    ).encode()
+
+def json_dumps(obj: Any, indent: bool = False, sort_keys: bool = False) -> str:
+    """Serialize to a JSON string (orjson when installed)"""
+    return json_dumps_bytes(obj, indent=indent, sort_keys=sort_keys).decode()
+
+def json_loads(data: Union[str, bytes]) -> Any:
+    """Parse JSON from str or bytes (orjson when installed)"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)